@@ -2,7 +2,7 @@
 ComplianceAgent definition
 """
 from agents import Agent, handoff
-from src.agent_system.tools.core import gather_compliance, web_search, prepare_flashcard
+from src.agent_system.tools.core import gather_compliance, web_search, prepare_flashcard, prepare_flashcards
 from src.config.prompts import COMPLIANCE_AGENT_INSTRUCTION, COMPLIANCE_AGENT_DESCRIPTION
 from .guide import GuideAgent
 
@@ -15,7 +15,7 @@ class ComplianceAgent(Agent):
             model="gpt-4.1", 
             handoff_description = COMPLIANCE_AGENT_DESCRIPTION,
             instructions=COMPLIANCE_AGENT_INSTRUCTION,
-            tools=[gather_compliance, prepare_flashcard, web_search],
+            tools=[gather_compliance, prepare_flashcards, prepare_flashcard, web_search],
             handoffs=[
                 handoff(guide_agent)
             ]
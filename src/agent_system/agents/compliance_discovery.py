@@ -3,7 +3,7 @@ ComplianceDiscoveryAgent definition
 """
 from agents import Agent, ModelSettings
 from openai.types.shared import Reasoning
-from src.agent_system.tools.core import compliance_lookup, web_search
+from src.agent_system.tools.core import discovery_compliance_lookup, web_search
 from src.config.prompts import COMPLIANCE_DISCOVERY_AGENT_INSTRUCTION, COMPLIANCE_DISCOVERY_AGENT_DESCRIPTION
 from pydantic import BaseModel
 from src.config.schemas import ComplianceList_Structure
@@ -18,6 +18,6 @@ class ComplianceDiscoveryAgent(Agent):
             ),
             handoff_description = COMPLIANCE_DISCOVERY_AGENT_DESCRIPTION,
             instructions=COMPLIANCE_DISCOVERY_AGENT_INSTRUCTION,
-            tools=[compliance_lookup, web_search],
+            tools=[discovery_compliance_lookup, web_search],
             output_type=ComplianceList_Structure
         ) 
\ No newline at end of file
@@ -1,5 +1,4 @@
-import os
-import openai
+from src.services.openai_service import get_openai_client
 
 # Input validation: check for empty or too long input
 def validate_input(text: str, max_length: int = 1099):
@@ -13,12 +12,11 @@ def validate_input(text: str, max_length: int = 1099):
     return True
 
 # Input moderation using OpenAI Moderation API
-def input_moderation(text: str):
+async def input_moderation(text: str):
     """
     Uses OpenAI Moderation API to check user input for unsafe content.
     """
-    openai.api_key = os.getenv("OPENAI_API_KEY")
-    response = openai.moderations.create(input=text)
+    response = await get_openai_client().moderations.create(input=text)
     results = response.results[0]
     if results.flagged:
         # raise ValueError(f"Input flagged as unsafe: {results.categories}")
@@ -4,8 +4,10 @@ Following OpenAI Agents SDK best practices for modular design
 """
 from .orchestration import WorkflowOrchestrator
 from . import operations
+from .ingestion import ingestion_queue
 
 __all__ = [
     'WorkflowOrchestrator',
-    'operations'
+    'operations',
+    'ingestion_queue'
 ]
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Background compliance ingestion queue - deduplicated names, fixed worker pool
+"""
+import asyncio
+import os
+import time
+from collections import deque
+
+from src.services.cache_service import TTLCache
+from src.services.kb_name_index import normalize_name
+from . import operations
+
+INGESTION_CONCURRENCY = int(os.getenv("INGESTION_CONCURRENCY", "2"))
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "200"))
+# Names ingested within this window are not queued again
+INGESTION_RECENT_TTL = float(os.getenv("INGESTION_RECENT_TTL", "21600"))
+
+
+def _percentile(samples, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+
+class IngestionQueue:
+    """Bounded queue of compliance names drained by a fixed pool of workers.
+
+    Each worker runs the ComplianceIngestionAgent for one name at a time, so
+    at most ``concurrency`` ingestions compete with interactive traffic.
+    Names are normalized and deduplicated against the queue, the running
+    ingestions and a TTL set of recently ingested names.
+    """
+
+    def __init__(self, concurrency: int = INGESTION_CONCURRENCY, maxsize: int = INGESTION_QUEUE_SIZE,
+                 recent_ttl: float = INGESTION_RECENT_TTL):
+        self.concurrency = concurrency
+        self.maxsize = maxsize
+        self._queue = None
+        self._workers = []
+        self._pending = set()     # normalized names queued or running
+        self._running = 0
+        self._recent = TTLCache(maxsize=10000, ttl=recent_ttl)
+        self._wait_times = deque(maxlen=500)
+        self._run_times = deque(maxlen=500)
+        self._stats = {"submitted": 0, "queued": 0, "duplicates": 0, "recent_skips": 0,
+                       "dropped": 0, "succeeded": 0, "failed": 0}
+
+    def submit(self, name: str) -> bool:
+        """Queue a compliance name for ingestion.
+
+        Returns:
+            bool: True if queued, False if it was a duplicate, recently ingested or the queue is full
+        """
+        key = normalize_name(name)
+        if not key:
+            return False
+        self._stats["submitted"] += 1
+        if key in self._pending:
+            self._stats["duplicates"] += 1
+            return False
+        if self._recent.get(key) is not None:
+            self._stats["recent_skips"] += 1
+            return False
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        try:
+            self._queue.put_nowait((key, name, time.perf_counter()))
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            print(f"⚠️ Ingestion queue full, dropping: {name[:30]}")
+            return False
+        self._pending.add(key)
+        self._stats["queued"] += 1
+        return True
+
+    async def _worker(self):
+        while True:
+            key, name, enqueued_at = await self._queue.get()
+            started = time.perf_counter()
+            self._wait_times.append(started - enqueued_at)
+            self._running += 1
+            try:
+                result = await operations.background_run_compliance_ingestion(name)
+                if result.get("status") == "success":
+                    self._stats["succeeded"] += 1
+                    self._recent.set(key, True)
+                else:
+                    self._stats["failed"] += 1
+            except Exception as e:
+                self._stats["failed"] += 1
+                print(f"⚠️ Ingestion worker error for {name[:30]}: {e}")
+            finally:
+                self._run_times.append(time.perf_counter() - started)
+                self._running -= 1
+                self._pending.discard(key)
+                self._queue.task_done()
+
+    def start(self):
+        """Start the worker pool (app startup)."""
+        if self._workers:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        print(f"🧵 Compliance ingestion pool started with {self.concurrency} workers")
+
+    async def stop(self):
+        """Cancel the workers; queued names are discarded (app shutdown)."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict:
+        return dict(
+            self._stats,
+            workers=len(self._workers),
+            queue_depth=self._queue.qsize() if self._queue is not None else 0,
+            running=self._running,
+            recent=len(self._recent),
+            wait_p50=_percentile(self._wait_times, 0.5),
+            wait_p95=_percentile(self._wait_times, 0.95),
+            run_p50=_percentile(self._run_times, 0.5),
+            run_p95=_percentile(self._run_times, 0.95),
+        )
+
+
+ingestion_queue = IngestionQueue()
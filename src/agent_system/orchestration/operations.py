@@ -1,37 +1,196 @@
 """
 Operations for research and search workflows
 """
+import asyncio
+import json
+import os
 import time
 import traceback
+from collections import deque
 from agents import Runner
 from langfuse import get_client
-from openai import AsyncOpenAI
 from sqlalchemy.future import select
+from src.services.cache_service import SingleFlight
+from src.services.openai_service import get_openai_client
 from src.services.database_service import db_get_recent_context, db_update_memory, db_get_latest_memory
 from src.config.prompts import CONTEXT_SUMMARY_PROMPT
+from .streaming import progress_publisher
+
+
+def _trace_metadata(**metadata):
+    """Attach metadata to the current Langfuse span (no-op without tracing)."""
+    try:
+        get_client().update_current_span(metadata=metadata)
+    except Exception:
+        pass
+
+
+# Concurrent identical web searches (same query and domain mode) share one Perplexity call
+_web_search_flight = SingleFlight()
 
 
 async def web_search(query: str, use_domain: bool = False):
-    """RAG API + Domain Search: Get domain metadata and search with domain filter"""
+    """RAG API + Domain Search: Get domain metadata and search with domain filter
+
+    Partial results are streamed as ``search_progress`` events into the
+    current request's event stream (for the caller that started the search).
+    """
+    on_progress = progress_publisher("search_progress")
+    key = (" ".join(query.split()), use_domain)
+    result = await _web_search_flight.do(key, _web_search, query, use_domain, on_progress)
+    if isinstance(result, dict) and result:
+        _trace_metadata(web_search_cache=result.get("cache"))
+    return result
+
+
+async def _web_search(query: str, use_domain: bool = False, on_progress=None):
     from src.services.knowledgebase_service import kb_domain_lookup
-    from src.services.perplexity_service import perplexity_search
     try:
+        if use_domain and WEB_SEARCH_SPECULATIVE:
+            return await _speculative_search(query, on_progress)
         if use_domain:
             domains = await kb_domain_lookup(query)
         else:
             domains = None
 
-        result = await perplexity_search(query, domains)
+        result = await _hedged_search(query, domains, on_progress)
         return result
         
     except Exception as e:
         print(f"❌ domain web search failed: {e}")
         return {}
 
+
+def web_search_flight_stats() -> dict:
+    return _web_search_flight.stats()
+
+
+# ─── Speculative / hedged web search ──────────────────────────────────────
+
+# Start the unfiltered search alongside the domain lookup, and hedge slow Perplexity calls
+WEB_SEARCH_SPECULATIVE = os.getenv("WEB_SEARCH_SPECULATIVE", "false").lower() == "true"
+# Latency percentile after which a duplicate request is sent (0 disables hedging)
+WEB_SEARCH_HEDGE_PERCENTILE = float(os.getenv("WEB_SEARCH_HEDGE_PERCENTILE", "0.95"))
+# How long a finished unfiltered result waits for the (preferred) domain-filtered one
+WEB_SEARCH_PREFER_FILTERED = float(os.getenv("WEB_SEARCH_PREFER_FILTERED_MS", "1500")) / 1000
+_HEDGE_MIN_SAMPLES = 20
+
+_search_latencies = deque(maxlen=500)
+_speculation_stats = {"speculative_runs": 0, "filtered_wins": 0, "unfiltered_wins": 0,
+                      "hedges_sent": 0, "primary_wins": 0, "hedge_wins": 0}
+
+
+def _acceptable(result) -> bool:
+    return isinstance(result, dict) and bool(result.get("content"))
+
+
+def _hedge_delay():
+    """Latency percentile of recent uncached searches, or None while warming up."""
+    if not WEB_SEARCH_SPECULATIVE or WEB_SEARCH_HEDGE_PERCENTILE <= 0 or len(_search_latencies) < _HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(_search_latencies)
+    return ordered[min(len(ordered) - 1, int(WEB_SEARCH_HEDGE_PERCENTILE * len(ordered)))]
+
+
+async def _first_acceptable(tasks: list, timeout: float | None = None):
+    """Wait for the first task with an acceptable result; returns (task, result) or (None, None)."""
+    pending = set(tasks)
+    deadline = None if timeout is None else time.perf_counter() + timeout
+    while pending:
+        remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        if not done:
+            break
+        for task in done:
+            if not task.cancelled() and task.exception() is None and _acceptable(task.result()):
+                return task, task.result()
+    return None, None
+
+
+async def _hedged_search(query: str, domains: list = None, on_progress=None):
+    """Perplexity search that sends one duplicate request once the first
+    exceeds the recent latency percentile; the first acceptable result wins.
+    Only the primary request reports progress."""
+    from src.services.perplexity_service import perplexity_search
+    started = time.perf_counter()
+    delay = _hedge_delay()
+    primary = asyncio.ensure_future(perplexity_search(query, domains, on_progress=on_progress))
+    if delay is None:
+        result = await primary
+    else:
+        tasks = [primary]
+        try:
+            winner, result = await _first_acceptable(tasks, timeout=delay)
+            if winner is None and not primary.done():
+                _speculation_stats["hedges_sent"] += 1
+                tasks.append(asyncio.ensure_future(perplexity_search(query, domains)))
+                winner, result = await _first_acceptable(tasks)
+            if winner is None:
+                result = primary.result() if primary.done() and not primary.cancelled() else []
+            elif len(tasks) > 1:
+                _speculation_stats["hedge_wins" if winner is tasks[1] else "primary_wins"] += 1
+        finally:
+            for task in tasks:
+                task.cancel()
+    if _acceptable(result) and result.get("cache") != "hit":
+        _search_latencies.append(time.perf_counter() - started)
+    return result
+
+
+async def _domain_filtered_search(query: str, on_progress=None):
+    from src.services.knowledgebase_service import kb_domain_lookup
+    domains = await kb_domain_lookup(query)
+    return await _hedged_search(query, domains, on_progress)
+
+
+async def _speculative_search(query: str, on_progress=None):
+    """Run the domain-filtered and the unfiltered search concurrently.
+
+    The filtered result is preferred; the unfiltered one wins only if the
+    filtered path fails or is still running WEB_SEARCH_PREFER_FILTERED
+    seconds after the unfiltered search finished. The loser is cancelled.
+    """
+    _speculation_stats["speculative_runs"] += 1
+    filtered = asyncio.ensure_future(_domain_filtered_search(query, on_progress))
+    unfiltered = asyncio.ensure_future(_hedged_search(query))
+    try:
+        winner, result = await _first_acceptable([filtered, unfiltered])
+        if winner is unfiltered and not filtered.done():
+            preferred, preferred_result = await _first_acceptable([filtered], timeout=WEB_SEARCH_PREFER_FILTERED)
+            if preferred is not None:
+                winner, result = preferred, preferred_result
+        if winner is None:
+            return {}
+        _speculation_stats["filtered_wins" if winner is filtered else "unfiltered_wins"] += 1
+        _trace_metadata(web_search_path="filtered" if winner is filtered else "unfiltered")
+        return result
+    finally:
+        filtered.cancel()
+        unfiltered.cancel()
+
+
+def web_search_speculation_stats() -> dict:
+    stats = dict(_speculation_stats, enabled=WEB_SEARCH_SPECULATIVE)
+    delay = _hedge_delay()
+    stats["hedge_after_seconds"] = None if delay is None else round(delay, 3)
+    return stats
+
 async def run_flashcard_agent(compliance_name: str, context: str = None, language: str = "en"):
-    """Generate flashcard for a compliance using FlashcardAgent"""
+    """Generate flashcard for a compliance using FlashcardAgent
+
+    Served from the flashcard cache when the same compliance, language and
+    context were generated before and the backing artifact has not changed;
+    cached flashcards carry ``"_cache": "hit"``.
+    """
     from ..agents import FlashcardAgent
-    
+    from src.services.flashcard_cache import get_cached_flashcard, cache_flashcard
+
+    cached = await get_cached_flashcard(compliance_name, language, context)
+    if cached is not None:
+        print(f"🃏 Flashcard cache hit: {compliance_name[:30]}")
+        _trace_metadata(flashcard_cache="hit")
+        return json.dumps(dict(json.loads(cached), _cache="hit"), ensure_ascii=False)
+
     agent = FlashcardAgent()
 
     result = await Runner.run(
@@ -43,13 +202,80 @@ async def run_flashcard_agent(compliance_name: str, context: str = None, languag
     final_output = result.final_output
     if hasattr(final_output, 'model_dump_json'):
         # Pydantic v2 method
-        return final_output.model_dump_json()
+        flashcard = final_output.model_dump_json()
     elif hasattr(final_output, 'json'):
         # Pydantic v1 method
-        return final_output.json()
+        flashcard = final_output.json()
     else:
         # Fallback to regular string conversion
-        return str(final_output)
+        flashcard = str(final_output)
+    await cache_flashcard(compliance_name, language, context, flashcard)
+    _trace_metadata(flashcard_cache="miss")
+    return flashcard
+
+FLASHCARD_CONCURRENCY = int(os.getenv("FLASHCARD_CONCURRENCY", "6"))
+
+
+async def run_flashcard_batch(compliance_names: list, context: str = None, language: str = "en"):
+    """Generate flashcards for several compliances concurrently
+
+    At most FLASHCARD_CONCURRENCY FlashcardAgent runs execute at once. Each card
+    is published as a ``flashcard`` event into the current request's stream
+    as soon as it completes (completion order), with its latency and cache
+    status; per-card latencies are attached to the trace.
+
+    Returns:
+        list: Flashcards (dicts) in completion order; failed cards as {"name", "error"}
+    """
+    from src.services.kb_name_index import normalize_name
+
+    names, seen = [], set()
+    for name in compliance_names:
+        key = normalize_name(name)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(name)
+    publish = progress_publisher("flashcard")
+    semaphore = asyncio.Semaphore(FLASHCARD_CONCURRENCY)
+    batch_started = time.perf_counter()
+
+    async def generate(name: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                output = await run_flashcard_agent(name, context, language)
+            except Exception as e:
+                print(f"⚠️ Flashcard generation failed for {name[:30]}: {e}")
+                return name, None, str(e), time.perf_counter() - started
+            return name, output, None, time.perf_counter() - started
+
+    cards, latencies = [], {}
+    tasks = [asyncio.create_task(generate(name)) for name in names]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            name, output, error, latency = await next_done
+            latencies[name] = round(latency, 2)
+            if error is not None:
+                cards.append({"name": name, "error": error})
+                continue
+            try:
+                card = json.loads(output)
+            except (TypeError, ValueError):
+                cards.append({"name": name, "flashcard": output})
+                continue
+            cache_status = card.pop("_cache", "miss") if isinstance(card, dict) else "miss"
+            cards.append(card)
+            if publish is not None:
+                publish(card, cache=cache_status, latency=round(latency, 3))
+    finally:
+        # A cancelled tool call (e.g. /stop) must not leave agent runs behind
+        for task in tasks:
+            task.cancel()
+
+    print(f"🃏 {len(cards)} flashcards generated in {time.perf_counter() - batch_started:.2f}s")
+    _trace_metadata(flashcard_latencies=latencies, flashcard_batch_seconds=round(time.perf_counter() - batch_started, 2))
+    return cards
+
 
 async def background_run_compliance_ingestion(query: str):
     """
@@ -152,15 +378,11 @@ async def background_run_context_summarization(session_id: str, latest_message_o
             context_data = await db_get_recent_context(db, session_id, messages_to_summarize)
             messages = [{"role": "system", "content": CONTEXT_SUMMARY_PROMPT}] + context_data["messages"]
             # 4) Call OpenAI for summarization
-            client = AsyncOpenAI()
-            try:
-                response = await client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=messages,
-                    temperature=0.3
-                )
-            finally:
-                await client.close()
+            response = await get_openai_client().chat.completions.create(
+                model="gpt-4o-mini",
+                messages=messages,
+                temperature=0.3
+            )
             
             summary = response.choices[0].message.content
             
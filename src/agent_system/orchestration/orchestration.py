@@ -13,7 +13,11 @@ from ..guardrails import validate_input, input_moderation
 from src.services.database_service import (
     db_store_message, db_get_recent_context
 )
+from src.services.kb_name_index import artifact_name_index
 from . import operations
+from .ingestion import ingestion_queue
+from .refresh import refresh_scheduler
+from .streaming import open_progress_channel, close_progress_channel, merge_progress
 # Streaming parsers no longer needed - using direct text streaming
 
 
@@ -43,6 +47,7 @@ class WorkflowOrchestrator:
         print(f"\n🚀 Starting workflow for session: {session_id}")
         print(f"📝 User message: {message}")
         self.db = db
+        progress_token = None
 
         try:
             print("🔍 Running pre-hooks...")
@@ -52,7 +57,7 @@ class WorkflowOrchestrator:
             yield {"type": "user_message", "response": user_message_obj}
             print("💾 Message stored in database")
             user_message_id = user_message_obj["message_id"]
-            if input_moderation(message):
+            if await input_moderation(message):
                 assistant_message_obj = await db_store_message(db, session_id, "Sorry, I cannot help with harmful queries", role="assistant", reply_to=user_message_id)
                 yield {"type": "harmful", "response": "Sorry, I cannot help with harmful queries"}
                 yield {"type": "completed", "response": assistant_message_obj}
@@ -66,7 +71,9 @@ class WorkflowOrchestrator:
             # Create Langfuse span 
             langfuse = get_client()
             with langfuse.start_as_current_span(name="Agent Workflow") as span:
-                
+
+                # Tools started by this run publish progress (e.g. search_progress) here
+                progress_queue, progress_token = open_progress_channel()
                 result = Runner.run_streamed(
                     starting_agent=self.triage_agent,
                     input=context_data.get("messages", [])
@@ -78,7 +85,7 @@ class WorkflowOrchestrator:
                 certification_response = []
                 # Track tool calls to match with tool outputs
                 tool_call_map = {}
-                async for event in result.stream_events():
+                async for source, event in merge_progress(result.stream_events(), progress_queue):
 
                     # Check for cancellation
                     if context and context.stop_event.is_set():
@@ -88,6 +95,14 @@ class WorkflowOrchestrator:
                         is_cancelled = True
                         break
 
+                    # 0) Progress published by running tools - forwarded as-is
+                    if source == "progress":
+                        if event["type"] == "flashcard":
+                            # Cards streamed by prepare_flashcards
+                            certification_response.append(event["response"])
+                        yield event
+                        continue
+
                     # 1) Agent handoff
                     if event.type == "agent_updated_stream_event":
                         current_agent = event.new_agent
@@ -132,8 +147,9 @@ class WorkflowOrchestrator:
                                         result_data = output
                                     else:
                                         result_data = json.loads(str(output))
+                                    cache_status = result_data.pop("_cache", "miss") if isinstance(result_data, dict) else "miss"
                                     certification_response.append(result_data)
-                                    yield {"type": "flashcard", "response": result_data}
+                                    yield {"type": "flashcard", "response": result_data, "cache": cache_status}
                                 except json.JSONDecodeError:
                                     # yield {"type": "flashcard", "response": str(output)}
                                     pass
@@ -162,11 +178,13 @@ class WorkflowOrchestrator:
                 certification_response = None
             else:
                 print(f"📋 Found {len(certification_response)} certifications")
-            #TODO: add it back
-            #     for card in certification_response:
-            #             asyncio.create_task(
-            #                 operations.background_run_compliance_ingestion(card["name"])
-            #                 )
+                # Ingest only schemes the knowledge base does not know yet; existing
+                # artifacts are re-ingested by the refresh scheduler, within its budget
+                for card in certification_response:
+                    if isinstance(card, dict) and card.get("name"):
+                        refresh_scheduler.record_request(card["name"])
+                        if card["name"] not in artifact_name_index:
+                            ingestion_queue.submit(card["name"])
 
             #save assistant message
             assistant_message_obj = await db_store_message(db, session_id, "".join(text_response), certifications=certification_response, role="assistant", reply_to=user_message_id, is_cancelled=is_cancelled)
@@ -185,4 +203,7 @@ class WorkflowOrchestrator:
             import traceback
             print(f"🔍 Full traceback: {traceback.format_exc()}")
             yield {"error": str(e)}
-            return
\ No newline at end of file
+            return
+        finally:
+            if progress_token is not None:
+                close_progress_channel(progress_token)
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""
+Staleness- and popularity-driven refresh scheduler for Compliance_Artifacts
+"""
+import asyncio
+import math
+import os
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+
+from src.services.kb_name_index import normalize_name
+from .ingestion import ingestion_queue
+
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "true").lower() == "true"
+REFRESH_SCAN_INTERVAL = float(os.getenv("REFRESH_SCAN_INTERVAL", "900"))
+# Maximum ingestion runs the scheduler may start per rolling hour
+REFRESH_BUDGET_PER_HOUR = int(os.getenv("REFRESH_BUDGET_PER_HOUR", "10"))
+# Artifacts younger than this are never refreshed
+REFRESH_MIN_AGE_DAYS = float(os.getenv("REFRESH_MIN_AGE_DAYS", "30"))
+# UTC hours during which refreshes may run, e.g. "0-6" or "22-5"
+REFRESH_OFF_PEAK_HOURS = os.getenv("REFRESH_OFF_PEAK_HOURS", "0-6")
+
+
+def _parse_hours(spec: str) -> set:
+    start, _, end = spec.partition("-")
+    start, end = int(start), int(end or start)
+    if start <= end:
+        return set(range(start, end + 1))
+    return set(range(start, 24)) | set(range(0, end + 1))
+
+
+def _age_days(updated_at, now: datetime):
+    if isinstance(updated_at, str):
+        try:
+            updated_at = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(updated_at, datetime):
+        return None
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return (now - updated_at).total_seconds() / 86400
+
+
+class RefreshScheduler:
+    """Periodically re-ingests the stalest and most requested artifacts.
+
+    Artifacts older than REFRESH_MIN_AGE_DAYS are ranked by
+    ``age / min_age * (1 + log1p(requests))`` and the top ones are submitted
+    to the background ingestion pool, only during off-peak hours, only when
+    the pool is idle, and never more than REFRESH_BUDGET_PER_HOUR per hour.
+    Request counts decay by half after every scan.
+    """
+
+    def __init__(self, budget_per_hour: int = REFRESH_BUDGET_PER_HOUR,
+                 min_age_days: float = REFRESH_MIN_AGE_DAYS,
+                 off_peak_hours: str = REFRESH_OFF_PEAK_HOURS,
+                 interval: float = REFRESH_SCAN_INTERVAL):
+        self.budget_per_hour = budget_per_hour
+        self.min_age_days = min_age_days
+        self.off_peak_hours = _parse_hours(off_peak_hours)
+        self.interval = interval
+        self._popularity = Counter()
+        self._runs = deque()
+        self._task = None
+        self._stats = {"scans": 0, "skipped_peak": 0, "skipped_busy": 0, "stale_found": 0,
+                       "submitted": 0, "last_scan_at": None}
+
+    def record_request(self, name: str):
+        """Count an interactive request for a compliance scheme."""
+        key = normalize_name(name)
+        if key:
+            self._popularity[key] += 1
+
+    def _budget_left(self, now: float) -> int:
+        while self._runs and now - self._runs[0] > 3600:
+            self._runs.popleft()
+        return self.budget_per_hour - len(self._runs)
+
+    async def candidates(self, limit: int) -> list:
+        """Names of the ``limit`` highest-priority stale artifacts."""
+        from src.services.knowledgebase_service import _get_weaviate_client
+        client = await _get_weaviate_client()
+        collection = client.collections.get("Compliance_Artifacts")
+        now = datetime.now(timezone.utc)
+        ranked = []
+        async for obj in collection.iterator(return_properties=["name", "updated_at"]):
+            name = obj.properties.get("name")
+            age = _age_days(obj.properties.get("updated_at"), now)
+            if not name or age is None or age < self.min_age_days:
+                continue
+            requests = self._popularity.get(normalize_name(name), 0)
+            ranked.append((age / self.min_age_days * (1 + math.log1p(requests)), name))
+        self._stats["stale_found"] = len(ranked)
+        ranked.sort(reverse=True)
+        return [name for _, name in ranked[:limit]]
+
+    async def run_once(self) -> int:
+        """One scheduling pass; returns the number of refreshes submitted."""
+        if datetime.now(timezone.utc).hour not in self.off_peak_hours:
+            self._stats["skipped_peak"] += 1
+            return 0
+        queue = ingestion_queue.stats()
+        if queue["queue_depth"] or queue["running"]:
+            self._stats["skipped_busy"] += 1
+            return 0
+        budget = self._budget_left(time.monotonic())
+        if budget <= 0:
+            return 0
+
+        self._stats["scans"] += 1
+        self._stats["last_scan_at"] = datetime.now(timezone.utc).isoformat()
+        submitted = 0
+        for name in await self.candidates(budget):
+            if ingestion_queue.submit(name):
+                self._runs.append(time.monotonic())
+                submitted += 1
+        for key in list(self._popularity):
+            self._popularity[key] //= 2
+            if not self._popularity[key]:
+                del self._popularity[key]
+        self._stats["submitted"] += submitted
+        if submitted:
+            print(f"♻️ Scheduled refresh of {submitted} stale compliance artifacts")
+        return submitted
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"⚠️ Compliance refresh scan failed: {e}")
+
+    def start(self):
+        if REFRESH_ENABLED and self._task is None and self.budget_per_hour > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return dict(
+            self._stats,
+            enabled=self._task is not None,
+            budget_per_hour=self.budget_per_hour,
+            budget_left=max(0, self._budget_left(time.monotonic())),
+            tracked_names=len(self._popularity),
+        )
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,64 @@
+"""
+Progress channel from tools into the orchestrator's event stream
+"""
+import asyncio
+from contextvars import ContextVar
+
+# Set by the orchestrator before starting a run; tools invoked by that run
+# inherit it through the copied context and publish progress events into it.
+_progress_channel: ContextVar[asyncio.Queue | None] = ContextVar("progress_channel", default=None)
+
+
+def open_progress_channel():
+    """Create the progress queue of the current request.
+
+    Returns:
+        tuple: (queue, token) - pass the token to close_progress_channel
+    """
+    queue = asyncio.Queue()
+    return queue, _progress_channel.set(queue)
+
+
+def close_progress_channel(token):
+    try:
+        _progress_channel.reset(token)
+    except ValueError:
+        # Generator resumed in a different context; the queue is dropped with it
+        pass
+
+
+def progress_publisher(event_type: str):
+    """Callback publishing ``{"type": event_type, "response": payload, **extra}`` events, or None outside a request."""
+    queue = _progress_channel.get()
+    if queue is None:
+        return None
+    return lambda payload, **extra: queue.put_nowait({"type": event_type, "response": payload, **extra})
+
+
+async def merge_progress(events, queue: asyncio.Queue):
+    """Interleave agent stream events with published progress events.
+
+    Yields:
+        tuple: ("agent", event) or ("progress", event) in arrival order
+    """
+    iterator = events.__aiter__()
+    next_event = asyncio.ensure_future(iterator.__anext__())
+    next_progress = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_event, next_progress}, return_when=asyncio.FIRST_COMPLETED)
+            if next_progress in done:
+                yield "progress", next_progress.result()
+                next_progress = asyncio.ensure_future(queue.get())
+            if next_event in done:
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                yield "agent", event
+                next_event = asyncio.ensure_future(iterator.__anext__())
+        while not queue.empty():
+            yield "progress", queue.get_nowait()
+    finally:
+        next_progress.cancel()
+        next_event.cancel()
@@ -1,5 +1,8 @@
+from typing import List, Optional
 from agents import function_tool
-from src.services.knowledgebase_service import kb_compliance_lookup, kb_compliance_save
+from src.services.knowledgebase_service import (
+    kb_compliance_lookup, kb_compliance_save, serialize_artifacts, COMPLIANCE_LOOKUP_FIELDS
+)
 from src.config.schemas import ComplianceArtifact
 # Global orchestrator removed - no longer needed for clean architecture!
 
@@ -37,20 +40,61 @@ async def prepare_flashcard(compliance_name:str, context: str = None, language:
     from ..orchestration import operations
     return await operations.run_flashcard_agent(compliance_name, context, language)
 
-# used by compliance artifact ingestion agent and flashcard agent
+# used by compliance agent
 @function_tool
-async def compliance_lookup(search_query: str, search_limit: int = 10):
-    """Perform Compliance Database search to provide relevant compliance artifacts.
+async def prepare_flashcards(compliance_names: List[str], context: str = None, language: str = "en"):
+    """Generate Flashcard JSONs for several compliances at once, concurrently.
 
     Args:
-        search_query: English search strings used to search the databases
-        search_limit: number of maximum results returned from the database (not exceeding 20).
+        compliance_names: The exact names (or best-known aliases) of every compliance/standard to summarize.
+        context: Optional short context (e.g., product type, target market/country) shared by all cards.
+                 Pass None if unavailable.
+        language: the language of the content inside the flashcards
 
     Returns:
-        A list of JSON objects containing the top hit compliance artifacts.
+        A JSON list of Flashcard objects in the order they finished. Each card is also streamed to the
+        user as soon as it is ready.
     """
+    from ..orchestration import operations
+    return await operations.run_flashcard_batch(compliance_names, context, language)
+
+def _compliance_lookup_tool(profile: str, exact_first: bool = False):
+    """Build a compliance_lookup tool whose default projection suits the calling agent.
 
-    return await kb_compliance_lookup(search_query, search_limit)
+    With ``exact_first`` a query that is exactly a known scheme name or alias
+    resolves straight to that artifact without a hybrid search.
+    """
+    default_fields = COMPLIANCE_LOOKUP_FIELDS[profile]
+
+    async def compliance_lookup(search_query: str, search_limit: int = 10, return_properties: Optional[List[str]] = None,
+                                additional_queries: Optional[List[str]] = None):
+        """Perform Compliance Database search to provide relevant compliance artifacts.
+
+        Args:
+            search_query: English search strings used to search the databases
+            search_limit: number of maximum results returned from the database (not exceeding 20).
+            return_properties: Optional artifact fields to return (e.g. ["name", "region", "overview"]).
+                               Leave empty for the default set.
+            additional_queries: Optional rephrasings or related queries. They are searched together with
+                                search_query in this one call and the results are merged, so prefer this
+                                over calling the tool again with a slightly different query.
+
+        Returns:
+            A compact JSON list of the top hit compliance artifacts (uuid, score and the selected fields).
+        """
+        fields = return_properties or default_fields
+        queries = [search_query] + (additional_queries or [])
+        artifacts = await kb_compliance_lookup(queries, search_limit, return_properties=fields, exact_first=exact_first)
+        return serialize_artifacts(artifacts, profile=profile)
+
+    return function_tool(compliance_lookup, name_override="compliance_lookup")
+
+# used by compliance artifact ingestion agent (full artifacts, needed to decide on updates)
+compliance_lookup = _compliance_lookup_tool("ingestion")
+# used by flashcard agent (looks up the specific scheme prepare_flashcard was given)
+flashcard_compliance_lookup = _compliance_lookup_tool("flashcard", exact_first=True)
+# used by compliance discovery agent
+discovery_compliance_lookup = _compliance_lookup_tool("discovery")
 
 @function_tool
 async def compliance_save(artifact: ComplianceArtifact, uuid: str = None):
@@ -116,3 +116,42 @@ async def health_check():
         status="healthy",
         message="Agentic workflow system is running"
     )
+
+# Service statistics endpoint
+async def service_stats():
+    """
+    Connection reuse and cache statistics of the shared service clients
+    """
+    from src.services.knowledgebase_service import kb_client_stats, projection_stats
+    from src.services.query_planner import plan_cache_stats
+    from src.services.whitelist_index import whitelist_snapshot
+    from src.services.kb_batch_writer import artifact_writer
+    from src.services.embedding_service import embedding_stats
+    from src.services.kb_name_index import artifact_name_index
+    from src.services.kb_artifact_cache import artifact_cache
+    from src.agent_system.orchestration.ingestion import ingestion_queue
+    from src.agent_system.orchestration.refresh import refresh_scheduler
+    from src.services.perplexity_service import perplexity_pool_stats, web_search_cache_stats
+    from src.services.knowledgebase_service import domain_lookup_flight_stats
+    from src.services.flashcard_cache import flashcard_cache_stats
+    from src.agent_system.orchestration.operations import web_search_flight_stats, web_search_speculation_stats
+    return {
+        "weaviate": kb_client_stats(),
+        "perplexity": perplexity_pool_stats(),
+        "web_search_cache": web_search_cache_stats(),
+        "flashcard_cache": flashcard_cache_stats(),
+        "web_search_speculation": web_search_speculation_stats(),
+        "single_flight": {
+            "web_search": web_search_flight_stats(),
+            "kb_domain_lookup": domain_lookup_flight_stats(),
+        },
+        "plan_cache": plan_cache_stats(),
+        "whitelist_snapshot": whitelist_snapshot.stats(),
+        "artifact_writer": artifact_writer.stats(),
+        "embeddings": embedding_stats(),
+        "compliance_lookup_projection": projection_stats(),
+        "name_index": artifact_name_index.stats(),
+        "artifact_cache": artifact_cache.stats(),
+        "ingestion": ingestion_queue.stats(),
+        "refresh_scheduler": refresh_scheduler.stats(),
+    }
@@ -4,12 +4,13 @@ FastAPI server configuration for OpenAI Agents SDK
 from dotenv import load_dotenv
 load_dotenv()
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.services import get_async_session
 from .endpoints import (
-    chat_stream, chat_simple, health_check, 
+    chat_stream, chat_simple, health_check, service_stats,
     ChatRequest, SessionRequest
 )
 from src.agent_system.session_manager import workflow_sessions
@@ -28,11 +29,43 @@ class StopRequest(BaseModel):
 class TestAgentRequest(BaseModel):
     query: str = "CE marking requirements for electronics"
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create application-scoped clients on startup and release them on shutdown"""
+    from src.services.knowledgebase_service import kb_connect, kb_close
+    from src.services.whitelist_index import whitelist_snapshot
+    from src.services.kb_batch_writer import artifact_writer
+    from src.services.kb_name_index import artifact_name_index
+    from src.agent_system.orchestration.ingestion import ingestion_queue
+    from src.agent_system.orchestration.refresh import refresh_scheduler
+    from src.services.perplexity_service import perplexity_connect, perplexity_close
+    from src.services.openai_service import openai_connect, openai_close
+    await kb_connect()
+    await openai_connect()
+    await perplexity_connect()
+    await whitelist_snapshot.start()
+    await artifact_name_index.start()
+    artifact_writer.start()
+    ingestion_queue.start()
+    refresh_scheduler.start()
+    try:
+        yield
+    finally:
+        await refresh_scheduler.stop()
+        await ingestion_queue.stop()
+        await artifact_writer.stop()
+        await artifact_name_index.stop()
+        await whitelist_snapshot.stop()
+        await perplexity_close()
+        await openai_close()
+        await kb_close()
+
 # Create FastAPI app
 app = FastAPI(
     title="Agentic Workflow API",
     description="A modular, agent-driven workflow for compliance/certification research",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -75,6 +108,11 @@ async def health():
     """Health check endpoint"""
     return await health_check()
 
+@app.get("/stats")
+async def stats():
+    """Connection pool and cache statistics"""
+    return await service_stats()
+
 @app.post("/test/compliance-ingestion-agent")
 async def compliance_ingestion_agent(request: TestAgentRequest):
     """Test endpoint for background compliance ingestion agent"""
@@ -91,6 +129,7 @@ async def root():
             "streaming_chat": "/ask/stream",
             "simple_chat": "/ask",
             "health": "/health",
+            "stats": "/stats",
         }
     }
 
@@ -0,0 +1,211 @@
+"""
+Caching service functions - in-memory LRU/TTL caches with an optional Postgres tier
+"""
+import asyncio
+import re
+import time
+from collections import OrderedDict
+
+# Words that do not change what a search is about ("export honey India US" ==
+# "What certifications do I need to export honey from India to the US?")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "to", "from", "in", "into", "on", "at", "by", "with",
+    "what", "which", "who", "how", "do", "does", "did", "i", "we", "my", "our", "you", "your",
+    "is", "are", "be", "can", "need", "needed", "needs", "required", "require", "requires",
+    "please", "list", "all", "any", "some", "me", "tell", "about", "get", "want",
+    "certification", "certifications", "certificate", "certificates", "requirement", "requirements",
+}
+
+
+def normalize_query(text: str) -> str:
+    """Normalize free text into an order-insensitive cache key.
+
+    Case-folds, strips punctuation, drops filler words and sorts the remaining
+    unique tokens so that near-repeat questions map to the same key.
+    """
+    tokens = re.findall(r"[\w\-/.]+", (text or "").casefold())
+    tokens = {t.strip(".-/") for t in tokens}
+    return " ".join(sorted(t for t in tokens if t and t not in _STOPWORDS))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at")
+
+    def __init__(self, value, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry.expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key, value, ttl: float | None = None):
+        self._data[key] = _Entry(value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry.value
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one shared in-flight task.
+
+    Every caller awaits the shared task through ``asyncio.shield``, so a
+    cancelled caller only stops waiting; the task itself is cancelled once
+    its last waiter is gone. Results are shared, callers must not mutate them.
+    """
+
+    def __init__(self):
+        self._calls = {}          # key -> [task, waiters]
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda _: self._calls.pop(key, None) if self._calls.get(key) is call else None)
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        task = call[0]
+        call[1] += 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            call[1] -= 1
+            if call[1] == 0 and not task.done():
+                # Unregister before cancelling so a caller arriving before the
+                # task finishes starts a fresh call instead of joining a cancelled one
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                self.abandoned += 1
+                task.cancel()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+            "coalesce_rate": round(self.coalesced / calls, 3) if calls else 0.0,
+        }
+
+
+_cache_table_ready = False
+
+
+async def _ensure_cache_table():
+    """Create the shared ``service_cache`` table on first use."""
+    global _cache_table_ready
+    if _cache_table_ready:
+        return
+    from src.services import engine
+    from .models import Base, CacheEntry
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[CacheEntry.__table__])
+    _cache_table_ready = True
+
+
+class PersistentCache:
+    """In-memory LRU front with an optional Postgres tier shared by workers and restarts.
+
+    Values must be JSON-serialisable. Postgres errors are logged and treated as
+    misses so a cache outage never fails a request.
+    """
+
+    def __init__(self, namespace: str, maxsize: int = 1024, ttl: float = 3600, persist: bool = False):
+        self.namespace = namespace
+        self.persist = persist
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.db_hits = 0
+        self.db_misses = 0
+        self.db_errors = 0
+
+    async def get(self, key: str):
+        value = self.memory.get(key)
+        if value is not None or not self.persist:
+            return value
+        from src.services import AsyncSessionLocal
+        from .database_service import db_cache_get
+        try:
+            await _ensure_cache_table()
+            async with AsyncSessionLocal() as db:
+                value = await db_cache_get(db, self.namespace, key)
+        except Exception as e:
+            self.db_errors += 1
+            print(f"⚠️ {self.namespace} cache read failed: {e}")
+            return None
+        if value is None:
+            self.db_misses += 1
+            return None
+        self.db_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value):
+        self.memory.set(key, value)
+        if not self.persist:
+            return
+        from src.services import AsyncSessionLocal
+        from .database_service import db_cache_set
+        try:
+            await _ensure_cache_table()
+            async with AsyncSessionLocal() as db:
+                await db_cache_set(db, self.namespace, key, value, self.memory.ttl)
+        except Exception as e:
+            self.db_errors += 1
+            print(f"⚠️ {self.namespace} cache write failed: {e}")
+
+    def stats(self) -> dict:
+        stats = self.memory.stats()
+        stats["persist"] = self.persist
+        if self.persist:
+            stats.update(db_hits=self.db_hits, db_misses=self.db_misses, db_errors=self.db_errors)
+        return stats
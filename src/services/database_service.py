@@ -3,11 +3,14 @@ Database service functions - Simplified (only actively used functions)
 """
 import datetime
 import logging
+import os
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, update
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi.encoders import jsonable_encoder
-from .models import ChatSession, ChatMessage
+from .models import ChatSession, ChatMessage, CacheEntry
 
 logger = logging.getLogger(__name__)
 
@@ -176,4 +179,49 @@ async def db_get_latest_memory(db: AsyncSession, session_id: str):
         .limit(1)
     )
     
-    return result.scalar_one_or_none()
\ No newline at end of file
+    return result.scalar_one_or_none()
+
+async def db_cache_get(db: AsyncSession, namespace: str, key: str):
+    """
+    Get an unexpired cached value from the service_cache table (None on miss)
+    """
+    result = await db.execute(
+        select(CacheEntry.value)
+        .where(CacheEntry.namespace == namespace)
+        .where(CacheEntry.cache_key == key)
+        .where(CacheEntry.expires_at > func.now())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+# Expired service_cache rows are purged by db_cache_set at most this often
+CACHE_PURGE_INTERVAL = float(os.getenv("CACHE_PURGE_INTERVAL", "600"))
+_last_cache_purge = float("-inf")
+
+async def db_cache_set(db: AsyncSession, namespace: str, key: str, value, ttl_seconds: float):
+    """
+    Upsert a cached value into the service_cache table, purging expired rows now and then
+    """
+    global _last_cache_purge
+    expires_at = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=ttl_seconds)
+    try:
+        now = time.monotonic()
+        if now - _last_cache_purge >= CACHE_PURGE_INTERVAL:
+            _last_cache_purge = now
+            await db.execute(delete(CacheEntry).where(CacheEntry.expires_at <= func.now()))
+        stmt = pg_insert(CacheEntry).values(
+            namespace=namespace,
+            cache_key=key,
+            value=value,
+            expires_at=expires_at
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheEntry.namespace, CacheEntry.cache_key],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at, "created_at": func.now()}
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Error storing cache entry: {e}")
+        await db.rollback()
+        raise
@@ -0,0 +1,241 @@
+"""
+Voyage embedding service functions - batched API calls with a persistent on-disk vector cache
+"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+
+import numpy as np
+import voyageai
+
+VOYAGE_MODEL = os.getenv("VOYAGE_MODEL", "voyage-3")
+VOYAGE_BATCH_SIZE = int(os.getenv("VOYAGE_BATCH_SIZE", "128"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+# Concurrent single-query embeddings arriving within this window share one API call
+EMBEDDING_BATCH_WINDOW = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5")) / 1000
+
+
+def _cache_key(text: str, input_type: str | None) -> str:
+    return hashlib.sha256(f"{VOYAGE_MODEL}\x00{input_type}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only vector cache: a memory-mapped float32 matrix plus a key index.
+
+    Files (per model) in ``directory``:
+        <model>.f32   float32 rows, grown in chunks and memory-mapped
+        <model>.keys  one content-hash per line; line ``i`` is row ``i``
+        <model>.json  {"dim": ...}
+
+    Appends take an exclusive file lock and re-read keys written by other
+    workers first, so several processes can share one cache directory.
+    """
+
+    _GROW_ROWS = 4096
+
+    def __init__(self, directory: str = EMBEDDING_CACHE_DIR, model: str = VOYAGE_MODEL):
+        self.directory = directory
+        base = os.path.join(directory, model.replace("/", "_"))
+        self._vectors_path = f"{base}.f32"
+        self._keys_path = f"{base}.keys"
+        self._meta_path = f"{base}.json"
+        self._index = {}
+        self._keys_offset = 0
+        self._matrix = None
+        self._capacity = 0
+        self.dim = None
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.dim = json.load(f)["dim"]
+            self._sync()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _map(self):
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        capacity = size // (4 * self.dim)
+        if capacity and capacity != self._capacity:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+            self._capacity = capacity
+
+    def _sync(self):
+        """Pick up keys appended since the last read (by this or another process)."""
+        if not os.path.exists(self._keys_path):
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.decode("ascii").splitlines():
+            self._index[line] = len(self._index)
+        self._keys_offset += len(complete)
+        if self.dim:
+            self._map()
+
+    def refresh(self):
+        """Load entries written by other workers since the last read."""
+        with open(self._keys_path, "ab") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_SH)
+            try:
+                self._sync()
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+    def get(self, key: str):
+        row = self._index.get(key)
+        if row is None or self.dim is None:
+            return None
+        if row >= self._capacity:
+            self._map()
+        return np.array(self._matrix[row])
+
+    def put_many(self, keys: list, vectors: list):
+        if not keys:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self.dim is None:
+            self.dim = len(vectors[0])
+            with open(self._meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+        with open(self._keys_path, "ab") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                self._sync()
+                new = [(k, v) for k, v in zip(keys, vectors) if k not in self._index]
+                if not new:
+                    return
+                start = len(self._index)
+                needed = start + len(new)
+                if needed > self._capacity:
+                    rows = max(needed, self._capacity + self._GROW_ROWS)
+                    with open(self._vectors_path, "ab") as f:
+                        f.truncate(rows * self.dim * 4)
+                    self._map()
+                self._matrix[start:needed] = np.asarray([v for _, v in new], dtype=np.float32)
+                self._matrix.flush()
+                # Keys are appended only after their vectors are on disk
+                keys_file.write("".join(f"{k}\n" for k, _ in new).encode("ascii"))
+                keys_file.flush()
+                self._sync()
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+
+_store: EmbeddingStore | None = None
+_voyage_client = None
+_pending_queries = []
+_flush_handle = None
+
+_stats = {"cache_hits": 0, "cache_misses": 0, "api_calls": 0, "texts_embedded": 0, "api_errors": 0}
+
+
+def _get_store() -> EmbeddingStore:
+    global _store
+    if _store is None:
+        _store = EmbeddingStore()
+    return _store
+
+
+def _get_voyage_client():
+    global _voyage_client
+    if _voyage_client is None:
+        api_key = os.getenv("VOYAGE_API_KEY")
+        if not api_key:
+            return None
+        _voyage_client = voyageai.AsyncClient(api_key=api_key)
+    return _voyage_client
+
+
+async def embed_texts(texts: list, input_type: str = "document") -> list:
+    """Embed texts, serving repeats from the disk cache and batching the misses.
+
+    Args:
+        texts: Texts to embed
+        input_type: Voyage input type ("query" or "document")
+
+    Returns:
+        list: One vector (list of floats) per text, or None entries if Voyage is unavailable
+    """
+    store = _get_store()
+    keys = [_cache_key(text, input_type) for text in texts]
+    vectors = [store.get(key) for key in keys]
+    if any(v is None for v in vectors) and os.path.exists(store.directory):
+        await asyncio.to_thread(store.refresh)
+        vectors = [store.get(key) if v is None else v for key, v in zip(keys, vectors)]
+
+    missing = {}
+    for key, text, vector in zip(keys, texts, vectors):
+        if vector is None:
+            missing.setdefault(key, text)
+    _stats["cache_hits"] += len(texts) - sum(v is None for v in vectors)
+    _stats["cache_misses"] += len(missing)
+
+    client = _get_voyage_client()
+    if missing and client is not None:
+        miss_keys = list(missing)
+        for i in range(0, len(miss_keys), VOYAGE_BATCH_SIZE):
+            chunk = miss_keys[i:i + VOYAGE_BATCH_SIZE]
+            try:
+                result = await client.embed([missing[k] for k in chunk], model=VOYAGE_MODEL, input_type=input_type)
+            except Exception as e:
+                _stats["api_errors"] += 1
+                print(f"⚠️ Voyage embedding failed: {e}")
+                break
+            _stats["api_calls"] += 1
+            _stats["texts_embedded"] += len(chunk)
+            try:
+                # File lock and disk writes stay off the event loop
+                await asyncio.to_thread(store.put_many, chunk, result.embeddings)
+            except OSError as e:
+                print(f"⚠️ Embedding cache write failed: {e}")
+            fresh = dict(zip(chunk, result.embeddings))
+            vectors = [fresh.get(k, v) if v is None else v for k, v in zip(keys, vectors)]
+
+    return [None if v is None else [float(x) for x in v] for v in vectors]
+
+
+async def _flush_queries():
+    global _flush_handle
+    batch, _pending_queries[:] = list(_pending_queries), []
+    _flush_handle = None
+    try:
+        vectors = await embed_texts([text for text, _ in batch], input_type="query")
+    except Exception as e:
+        vectors = [None] * len(batch)
+        print(f"⚠️ Voyage query embedding failed: {e}")
+    for (_, future), vector in zip(batch, vectors):
+        if not future.done():
+            future.set_result(vector)
+
+
+async def embed_query(text: str):
+    """Embed one search query (None if unavailable).
+
+    Queries issued concurrently within EMBEDDING_BATCH_WINDOW_MS are sent to
+    Voyage in a single call.
+    """
+    global _flush_handle
+    store = _get_store()
+    cached = store.get(_cache_key(text, "query"))
+    if cached is not None:
+        _stats["cache_hits"] += 1
+        return [float(x) for x in cached]
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _pending_queries.append((text, future))
+    if _flush_handle is None:
+        _flush_handle = loop.call_later(EMBEDDING_BATCH_WINDOW, lambda: asyncio.ensure_future(_flush_queries()))
+    return await future
+
+
+def embedding_stats() -> dict:
+    """Cache and batching counters of the embedding layer."""
+    stats = dict(_stats)
+    stats["cached_vectors"] = len(_store) if _store is not None else 0
+    stats["model"] = VOYAGE_MODEL
+    if stats["api_calls"]:
+        stats["avg_batch_size"] = round(stats["texts_embedded"] / stats["api_calls"], 2)
+    return stats
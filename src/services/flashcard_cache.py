@@ -0,0 +1,59 @@
+"""
+Flashcard cache - generated flashcards reused across requests until their artifact changes
+"""
+import hashlib
+import json
+import os
+
+from .cache_service import PersistentCache
+from .kb_name_index import artifact_name_index, normalize_name
+
+_flashcard_cache = PersistentCache(
+    "flashcard",
+    maxsize=int(os.getenv("FLASHCARD_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("FLASHCARD_CACHE_TTL", str(7 * 24 * 3600))),
+    persist=os.getenv("FLASHCARD_CACHE_PERSIST", "true").lower() == "true",
+)
+_stats = {"stale": 0}
+
+
+def _cache_key(compliance_name: str, language: str, context: str | None):
+    """(key, artifact content hash) for a flashcard request.
+
+    Names that resolve to a Compliance_Artifacts object are keyed by its UUID,
+    so aliases share one entry. The context (product, market) decides
+    ``mandatory``; it is hashed case- and whitespace-insensitively but
+    order-preserving, so "CN→EU" and "EU→CN" stay distinct.
+    """
+    uuid = artifact_name_index.resolve(compliance_name)
+    subject = f"uuid:{uuid}" if uuid else f"name:{normalize_name(compliance_name)}"
+    context_hash = hashlib.sha256(" ".join((context or "").casefold().split()).encode("utf-8")).hexdigest()[:16]
+    key = f"{subject}|{(language or 'en').casefold()}|{context_hash}"
+    return key, artifact_name_index.content_hash(uuid) if uuid else None
+
+
+async def get_cached_flashcard(compliance_name: str, language: str, context: str | None):
+    """Cached flashcard JSON, or None on a miss or if its artifact changed since."""
+    key, content_hash = _cache_key(compliance_name, language, context)
+    entry = await _flashcard_cache.get(key)
+    if entry is None:
+        return None
+    if entry.get("content_hash") != content_hash:
+        _stats["stale"] += 1
+        return None
+    return entry["flashcard"]
+
+
+async def cache_flashcard(compliance_name: str, language: str, context: str | None, flashcard: str):
+    """Store a generated flashcard JSON string (ignored unless it is a JSON object)."""
+    try:
+        if not isinstance(json.loads(flashcard), dict):
+            return
+    except (TypeError, ValueError):
+        return
+    key, content_hash = _cache_key(compliance_name, language, context)
+    await _flashcard_cache.set(key, {"flashcard": flashcard, "content_hash": content_hash})
+
+
+def flashcard_cache_stats() -> dict:
+    return dict(_flashcard_cache.stats(), **_stats)
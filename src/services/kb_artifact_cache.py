@@ -0,0 +1,70 @@
+"""
+Read-through cache for Compliance_Artifacts lookups with write invalidation
+"""
+import os
+
+from .cache_service import TTLCache
+
+ARTIFACT_CACHE_SIZE = int(os.getenv("ARTIFACT_CACHE_SIZE", "2048"))
+ARTIFACT_CACHE_TTL = float(os.getenv("ARTIFACT_CACHE_TTL", "300"))
+
+
+class ArtifactCache:
+    """Bounded LRU caches of artifacts by UUID and of lookup results by query.
+
+    Every kb_compliance_save bumps a collection version counter. Query entries
+    remember the version they were computed at and are ignored once it
+    changes; the saved artifact itself is written through to the UUID cache.
+    The TTL bounds staleness from writes made by other workers.
+    """
+
+    def __init__(self, maxsize: int = ARTIFACT_CACHE_SIZE, ttl: float = ARTIFACT_CACHE_TTL):
+        self.by_uuid = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.by_query = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.version = 0
+        self.stale_queries = 0
+
+    def get_artifact(self, uuid: str, fields: list | None = None):
+        """Cached artifact (all properties, projected to ``fields``) or None."""
+        properties = self.by_uuid.get(str(uuid))
+        if properties is None:
+            return None
+        if fields:
+            properties = {k: v for k, v in properties.items() if k in fields}
+        return {"uuid": str(uuid), "score": 1.0, **properties}
+
+    def put_artifact(self, uuid: str, properties: dict):
+        self.by_uuid.set(str(uuid), dict(properties))
+
+    def get_query(self, key):
+        entry = self.by_query.get(key)
+        if entry is None:
+            return None
+        version, results = entry
+        if version != self.version:
+            self.stale_queries += 1
+            self.by_query.pop(key)
+            return None
+        return [dict(r) for r in results]
+
+    def put_query(self, key, results: list, version: int):
+        """Store results computed at ``version`` (a write in between makes them stale at once)."""
+        self.by_query.set(key, (version, [dict(r) for r in results]))
+
+    def on_write(self, uuid: str, properties: dict | None = None):
+        """Invalidate query results and write the saved artifact through."""
+        self.version += 1
+        if properties is None:
+            self.by_uuid.pop(str(uuid))
+        else:
+            self.put_artifact(uuid, properties)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "artifacts": self.by_uuid.stats(),
+            "queries": dict(self.by_query.stats(), stale=self.stale_queries),
+        }
+
+
+artifact_cache = ArtifactCache()
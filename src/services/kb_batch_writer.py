@@ -0,0 +1,218 @@
+"""
+Buffered batch writer for the Compliance_Artifacts collection
+"""
+import asyncio
+import os
+import time
+
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
+from weaviate.util import get_valid_uuid
+
+COMPLIANCE_COLLECTION = "Compliance_Artifacts"
+BATCH_WRITER_SIZE = int(os.getenv("KB_BATCH_SIZE", "100"))
+BATCH_WRITER_INTERVAL = float(os.getenv("KB_BATCH_FLUSH_INTERVAL", "1.0"))
+SKIP_UNCHANGED = os.getenv("KB_SKIP_UNCHANGED", "true").lower() == "true"
+# Embed artifacts and queries client-side (one batched, cached Voyage call per flush).
+# Opt-in: VOYAGE_MODEL must be the model the collection was vectorized with.
+CLIENT_SIDE_VECTORS = os.getenv("KB_CLIENT_SIDE_VECTORS", "false").lower() == "true"
+
+# Indexed text fields that make up an artifact's document embedding
+_DOCUMENT_FIELDS = ["name", "aliases", "legal_reference", "domain_tags", "scope_tags", "overview", "full_description"]
+
+
+def _document_text(properties: dict) -> str:
+    parts = []
+    for field in _DOCUMENT_FIELDS:
+        value = properties.get(field)
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        if value:
+            parts.append(f"{field}: {value}")
+    return "\n".join(parts)
+
+
+class ArtifactBatchWriter:
+    """Buffers artifact upserts and writes them with one Weaviate batch request.
+
+    A buffer is flushed when it reaches ``batch_size`` objects or after
+    ``flush_interval`` seconds. Each ``submit`` call awaits only its own
+    object: per-object errors are raised to that caller and do not fail the
+    rest of the batch.
+
+    Objects carrying a ``content_hash`` property equal to the hash already
+    stored for their UUID are not rewritten, so Weaviate does not re-vectorize
+    and re-index unchanged artifacts; only their ``updated_at`` is touched so
+    staleness checks see that the content was re-verified.
+    """
+
+    def __init__(self, collection_name: str = COMPLIANCE_COLLECTION,
+                 batch_size: int = BATCH_WRITER_SIZE, flush_interval: float = BATCH_WRITER_INTERVAL):
+        self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stats = {"submitted": 0, "batches": 0, "written": 0, "skipped_unchanged": 0,
+                       "touched": 0, "failed": 0, "flush_seconds": 0.0}
+
+    async def submit(self, uuid: str, properties: dict, vector=None) -> str:
+        """Queue one object for upsert and wait until its batch is written.
+
+        Returns:
+            str: The object UUID
+
+        Raises:
+            ValueError: If ``uuid`` is not a valid UUID
+            Exception: If Weaviate rejected this object
+        """
+        # A malformed UUID would fail the whole batch request, so reject it here
+        try:
+            uuid = get_valid_uuid(uuid)
+        except (ValueError, TypeError) as e:
+            self._stats["failed"] += 1
+            raise ValueError(f"Invalid compliance artifact UUID {uuid!r}: {e}") from e
+        if self._task is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._buffer.append((uuid, properties, vector, future))
+        self._stats["submitted"] += 1
+        if len(self._buffer) >= self.batch_size:
+            asyncio.create_task(self.flush())
+        return await future
+
+    async def flush(self):
+        """Write everything currently buffered in a single batch request."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            pending, self._buffer = self._buffer, []
+
+            # Last write wins for repeated UUIDs inside one batch
+            latest = {}
+            for item in pending:
+                latest[item[0]] = item
+            items = list(latest.values())
+
+            start = time.perf_counter()
+            try:
+                from .knowledgebase_service import _get_weaviate_client
+                client = await _get_weaviate_client()
+                collection = client.collections.get(self.collection_name)
+                if SKIP_UNCHANGED:
+                    items = await self._drop_unchanged(collection, items)
+                result = None
+                if items and CLIENT_SIDE_VECTORS:
+                    from .embedding_service import embed_texts
+                    missing = [i for i, item in enumerate(items) if item[2] is None]
+                    vectors = await embed_texts([_document_text(items[i][1]) for i in missing])
+                    for i, vector in zip(missing, vectors):
+                        uuid, properties, _, future = items[i]
+                        items[i] = (uuid, properties, vector, future)
+                if items:
+                    result = await collection.data.insert_many([
+                        DataObject(properties=properties, uuid=uuid, vector=vector)
+                        for uuid, properties, vector, _ in items
+                    ])
+            except Exception as e:
+                for *_, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                        self._stats["failed"] += 1
+                print(f"❌ Compliance artifact batch of {len(items)} failed: {e}")
+                return
+            finally:
+                self._stats["batches"] += 1
+                self._stats["flush_seconds"] += time.perf_counter() - start
+
+            errors = {items[index][0]: error.message for index, error in result.errors.items()} if result else {}
+            for uuid, *_, future in pending:
+                if future.done():
+                    continue
+                if uuid in errors:
+                    future.set_exception(Exception(errors[uuid]))
+                else:
+                    future.set_result(uuid)
+            self._stats["written"] += len(items) - len(errors)
+            self._stats["failed"] += len(errors)
+            if errors:
+                print(f"⚠️ {len(errors)}/{len(items)} compliance artifacts rejected in batch")
+
+    async def _drop_unchanged(self, collection, items: list) -> list:
+        """Resolve and remove items whose content hash matches the stored object.
+
+        Stored hashes are fetched for every flush (one ``contains_any`` query),
+        not remembered, since other workers and bulk imports rewrite objects too.
+        """
+        hashed = [uuid for uuid, properties, *_ in items if properties.get("content_hash")]
+        stored_hashes = {}
+        if hashed:
+            try:
+                response = await collection.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(hashed),
+                    limit=len(hashed),
+                    return_properties=["content_hash"],
+                )
+            except Exception as e:
+                # The skip is only an optimization: write everything rather than fail the batch
+                print(f"⚠️ Stored content hash lookup failed, writing all {len(items)} artifacts: {e}")
+                return items
+            for obj in response.objects:
+                if obj.properties.get("content_hash"):
+                    stored_hashes[str(obj.uuid)] = obj.properties["content_hash"]
+
+        changed, unchanged = [], []
+        for item in items:
+            content_hash = item[1].get("content_hash")
+            if content_hash and stored_hashes.get(item[0]) == content_hash:
+                unchanged.append(item)
+            else:
+                changed.append(item)
+
+        # Cheap touch: a properties-only update of updated_at
+        touches = await asyncio.gather(*(
+            collection.data.update(uuid=uuid, properties={"updated_at": properties["updated_at"]})
+            for uuid, properties, *_ in unchanged if properties.get("updated_at")
+        ), return_exceptions=True)
+        touches = iter(touches)
+        for item in unchanged:
+            uuid, properties, _, future = item
+            if properties.get("updated_at") and isinstance(next(touches), Exception):
+                # Fall back to a full write rather than leave updated_at behind
+                changed.append(item)
+                continue
+            if not future.done():
+                future.set_result(uuid)
+            self._stats["skipped_unchanged"] += 1
+            self._stats["touched"] += bool(properties.get("updated_at"))
+        return changed
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Compliance artifact flush failed: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the timer and write whatever is still buffered (app shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["buffered"] = len(self._buffer)
+        stats["avg_batch_size"] = round(stats["written"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["flush_seconds"] = round(stats["flush_seconds"], 3)
+        return stats
+
+
+artifact_writer = ArtifactBatchWriter()
@@ -0,0 +1,215 @@
+"""
+Bulk import of Compliance_Artifacts from a JSONL file or JSON array
+
+Usage:
+    python -m src.services.kb_bulk_import artifacts.jsonl [--batch-size 200] [--concurrency 4]
+
+Records are streamed (constant memory), validated against ComplianceArtifact
+in a process pool, embedded in batches and written with the Weaviate batch
+API. Progress is checkpointed so an interrupted run resumes where it stopped.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import ijson
+from pydantic import ValidationError
+from weaviate.classes.data import DataObject
+
+from src.config.schemas import ComplianceArtifact
+from .embedding_service import embed_texts
+from .kb_batch_writer import COMPLIANCE_COLLECTION, CLIENT_SIDE_VECTORS, _document_text
+from .knowledgebase_service import _artifact_properties, _artifact_uuid, _get_weaviate_client, kb_close
+
+IMPORT_BATCH_SIZE = int(os.getenv("KB_IMPORT_BATCH_SIZE", "200"))
+IMPORT_CONCURRENCY = int(os.getenv("KB_IMPORT_CONCURRENCY", "4"))
+IMPORT_WORKERS = int(os.getenv("KB_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+
+
+def iter_records(path: str):
+    """Stream records from a JSONL file or a top-level JSON array."""
+    with open(path, "rb") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == b"[":
+            yield from ijson.items(f, "item", use_float=True)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _validate_batch(records: list) -> list:
+    """Validate raw records (runs in a worker process).
+
+    Returns:
+        list: (uuid, properties) for valid records, or (None, error message)
+    """
+    results = []
+    for record in records:
+        try:
+            artifact = ComplianceArtifact.model_validate(record)
+        except ValidationError as e:
+            error = e.errors()[0]
+            name = record.get("name", "?") if isinstance(record, dict) else "?"
+            field = ".".join(str(part) for part in error["loc"])
+            results.append((None, f"{name}: {field}: {error['msg']}"))
+            continue
+        # Keep the record's own timestamp so the refresh scheduler sees its real age
+        results.append((_artifact_uuid(artifact), _artifact_properties(artifact, updated_at=artifact.updated_at)))
+    return results
+
+
+class Checkpoint:
+    """Number of leading records already imported, persisted atomically.
+
+    Batches may finish out of order; only the contiguous prefix of finished
+    batches is recorded so a resumed run never skips an unwritten record.
+    """
+
+    def __init__(self, path: str, source: str):
+        self.path = path
+        self.source = os.path.abspath(source)
+        self.offset = 0
+        self._finished = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("source") == self.source:
+                self.offset = data.get("offset", 0)
+
+    def finish(self, start: int, end: int):
+        self._finished[start] = end
+        while self.offset in self._finished:
+            self.offset = self._finished.pop(self.offset)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"source": self.source, "offset": self.offset}, f)
+        os.replace(tmp, self.path)
+
+
+async def _write_batch(collection, items: list) -> int:
+    """Embed and insert one batch; returns the number of rejected objects."""
+    vectors = [None] * len(items)
+    if CLIENT_SIDE_VECTORS:
+        vectors = await embed_texts([_document_text(p) for _, p in items], input_type="document")
+    result = await collection.data.insert_many([
+        DataObject(properties=properties, uuid=uuid, vector=vector)
+        for (uuid, properties), vector in zip(items, vectors)
+    ])
+    for index, error in list(result.errors.items())[:3]:
+        print(f"⚠️ Rejected {items[index][1]['name']}: {error.message}")
+    return len(result.errors)
+
+
+async def bulk_import(
+    path: str,
+    checkpoint_path: str | None = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    concurrency: int = IMPORT_CONCURRENCY,
+    workers: int = IMPORT_WORKERS,
+    restart: bool = False,
+) -> dict:
+    """Import every artifact in ``path`` into Compliance_Artifacts.
+
+    Args:
+        path: JSONL file or JSON array of ComplianceArtifact records
+        checkpoint_path: Resume file (default: ``<path>.checkpoint``)
+        batch_size: Records per validation / embedding / insert batch
+        concurrency: Maximum batches in flight (bounds memory and Weaviate load)
+        workers: Validation processes
+        restart: Ignore an existing checkpoint
+
+    Returns:
+        dict: Import counters
+    """
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint"
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint(checkpoint_path, path)
+    if checkpoint.offset:
+        print(f"↩️ Resuming {path} after {checkpoint.offset} records")
+
+    client = await _get_weaviate_client()
+    collection = client.collections.get(COMPLIANCE_COLLECTION)
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(concurrency)
+    stats = {"imported": 0, "invalid": 0, "rejected": 0, "failed_batches": 0}
+    started = time.perf_counter()
+    tasks = set()
+
+    async def process(start: int, records: list, pool):
+        try:
+            validated = await loop.run_in_executor(pool, _validate_batch, records)
+            items = [(uuid, p) for uuid, p in validated if uuid is not None]
+            for _, error in validated:
+                if isinstance(error, str):
+                    stats["invalid"] += 1
+                    print(f"⚠️ Invalid record: {error}")
+            rejected = await _write_batch(collection, items) if items else 0
+            stats["rejected"] += rejected
+            stats["imported"] += len(items) - rejected
+            checkpoint.finish(start, start + len(records))
+            elapsed = time.perf_counter() - started
+            print(f"📦 {checkpoint.offset} records done, {stats['imported']} imported "
+                  f"({stats['imported'] / elapsed:.1f} obj/s)")
+        except Exception as e:
+            # Leave the checkpoint behind this batch so a rerun retries it
+            stats["failed_batches"] += 1
+            print(f"❌ Batch at record {start} failed: {e}")
+        finally:
+            slots.release()
+
+    records = islice(iter_records(path), checkpoint.offset, None)
+    position = checkpoint.offset
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            await slots.acquire()
+            batch = list(islice(records, batch_size))
+            if not batch:
+                slots.release()
+                break
+            task = asyncio.create_task(process(position, batch, pool))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            position += len(batch)
+        await asyncio.gather(*tasks)
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["objects_per_second"] = round(stats["imported"] / elapsed, 1) if elapsed else 0.0
+    stats["checkpoint"] = checkpoint.offset
+    return stats
+
+
+async def _main(args):
+    try:
+        stats = await bulk_import(
+            args.path,
+            checkpoint_path=args.checkpoint,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            workers=args.workers,
+            restart=args.restart,
+        )
+    finally:
+        await kb_close()
+    print(f"✅ Bulk import finished: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import Compliance_Artifacts from JSONL or a JSON array")
+    parser.add_argument("path", help="JSONL file or JSON array of ComplianceArtifact records")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <path>.checkpoint)")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=IMPORT_CONCURRENCY)
+    parser.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint")
+    asyncio.run(_main(parser.parse_args()))
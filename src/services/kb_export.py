@@ -0,0 +1,178 @@
+"""
+Columnar on-disk export of Compliance_Artifacts and a zero-copy memmap loader
+
+Usage:
+    python -m src.services.kb_export exports/compliance_artifacts
+
+Layout of an export directory:
+    manifest.json        collection, count, dim, columns, exported_at
+    uuid.npy             (count,) fixed-width ASCII UUIDs
+    vectors.npy          (count, dim) float32 (absent if the collection has no vectors)
+    <column>.bin         concatenated UTF-8 JSON values of one property
+    <column>.offsets.npy (count + 1,) int64 byte offsets into <column>.bin
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .kb_batch_writer import COMPLIANCE_COLLECTION
+from .knowledgebase_service import ARTIFACT_PROPERTIES, _get_weaviate_client, kb_close
+
+EXPORT_FORMAT_VERSION = 1
+
+
+def _json_value(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _vector_of(obj):
+    vector = obj.vector
+    if isinstance(vector, dict):
+        vector = vector.get("default", next(iter(vector.values()), None))
+    return vector
+
+
+async def export_artifacts(directory: str) -> dict:
+    """Stream Compliance_Artifacts (vectors included) into a columnar export directory.
+
+    Objects are written as they are paged in, so memory stays constant apart
+    from the per-column offsets. The export is built in ``<directory>.tmp``
+    and swapped in when complete.
+
+    Returns:
+        dict: The export manifest
+    """
+    client = await _get_weaviate_client()
+    collection = client.collections.get(COMPLIANCE_COLLECTION)
+    tmp = f"{directory}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = {name: open(os.path.join(tmp, f"{name}.bin"), "wb") for name in ARTIFACT_PROPERTIES}
+    offsets = {name: [0] for name in ARTIFACT_PROPERTIES}
+    uuids = []
+    dim = None
+    started = time.perf_counter()
+    raw_vectors_path = os.path.join(tmp, "vectors.f32")
+    try:
+        with open(raw_vectors_path, "wb") as raw_vectors:
+            async for obj in collection.iterator(include_vector=True, return_properties=ARTIFACT_PROPERTIES):
+                vector = _vector_of(obj)
+                if vector is not None:
+                    if dim is None:
+                        dim = len(vector)
+                        # Rows exported before the first vector get zeros
+                        raw_vectors.write(np.zeros((len(uuids), dim), dtype=np.float32).tobytes())
+                    raw_vectors.write(np.asarray(vector, dtype=np.float32).tobytes())
+                elif dim is not None:
+                    raw_vectors.write(np.zeros(dim, dtype=np.float32).tobytes())
+                uuids.append(str(obj.uuid))
+                for name, f in columns.items():
+                    offsets[name].append(offsets[name][-1] + f.write(_json_value(obj.properties.get(name))))
+    finally:
+        for f in columns.values():
+            f.close()
+
+    count = len(uuids)
+    np.save(os.path.join(tmp, "uuid.npy"), np.array(uuids, dtype="S36"))
+    for name, column_offsets in offsets.items():
+        np.save(os.path.join(tmp, f"{name}.offsets.npy"), np.array(column_offsets, dtype=np.int64))
+    if dim:
+        # Copy the raw rows behind a .npy header so loaders can memory-map them
+        source = np.memmap(raw_vectors_path, dtype=np.float32, mode="r", shape=(count, dim))
+        target = np.lib.format.open_memmap(os.path.join(tmp, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, dim))
+        for start in range(0, count, 4096):
+            target[start:start + 4096] = source[start:start + 4096]
+        target.flush()
+        del source, target
+    os.remove(raw_vectors_path)
+
+    manifest = {
+        "format_version": EXPORT_FORMAT_VERSION,
+        "collection": COMPLIANCE_COLLECTION,
+        "count": count,
+        "dim": dim,
+        "columns": list(ARTIFACT_PROPERTIES),
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp, directory)
+    elapsed = time.perf_counter() - started
+    print(f"📤 Exported {count} compliance artifacts to {directory} in {elapsed:.1f}s")
+    return manifest
+
+
+class ArtifactExport:
+    """Read-only, memory-mapped view of an export directory.
+
+    Nothing is copied on open: vectors, UUIDs and column offsets are
+    memory-mapped and property values are decoded only when a row is read.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != EXPORT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported export format in {directory}: {self.manifest.get('format_version')}")
+        self.uuids = np.load(os.path.join(directory, "uuid.npy"), mmap_mode="r")
+        vectors_path = os.path.join(directory, "vectors.npy")
+        self.vectors = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+        self._columns = {}
+        for name in self.manifest["columns"]:
+            offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r")
+            blob_path = os.path.join(directory, f"{name}.bin")
+            blob = np.memmap(blob_path, dtype=np.uint8, mode="r") if os.path.getsize(blob_path) else np.empty(0, np.uint8)
+            self._columns[name] = (offsets, blob)
+        self._rows_by_uuid = None
+
+    def __len__(self):
+        return self.manifest["count"]
+
+    @property
+    def columns(self) -> list:
+        return list(self._columns)
+
+    def value(self, row: int, column: str):
+        offsets, blob = self._columns[column]
+        return json.loads(blob[offsets[row]:offsets[row + 1]].tobytes())
+
+    def row(self, row: int, columns: list | None = None) -> dict:
+        """Properties of one object as a dictionary (``uuid`` included)."""
+        result = {"uuid": self.uuids[row].decode("ascii")}
+        for name in columns or self._columns:
+            result[name] = self.value(row, name)
+        return result
+
+    def get(self, uuid: str, columns: list | None = None):
+        """Look up an object by UUID (None if absent)."""
+        if self._rows_by_uuid is None:
+            self._rows_by_uuid = {u.decode("ascii"): i for i, u in enumerate(self.uuids)}
+        row = self._rows_by_uuid.get(str(uuid))
+        return None if row is None else self.row(row, columns)
+
+    def iter_rows(self, columns: list | None = None):
+        for i in range(len(self)):
+            yield self.row(i, columns)
+
+
+async def _main(args):
+    try:
+        await export_artifacts(args.directory)
+    finally:
+        await kb_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Compliance_Artifacts to a memory-mappable columnar directory")
+    parser.add_argument("directory", help="Output directory (replaced when the export completes)")
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,161 @@
+"""
+Exact name/alias index over Compliance_Artifacts for instant scheme resolution
+"""
+import asyncio
+import os
+import re
+import unicodedata
+
+COMPLIANCE_COLLECTION = "Compliance_Artifacts"
+NAME_INDEX_REFRESH_INTERVAL = float(os.getenv("NAME_INDEX_REFRESH_INTERVAL", "600"))
+
+
+def normalize_name(text: str) -> str:
+    """Case-folded, accent- and punctuation-free key ("CE-Marking" == "ce marking" == "CE MARKING")."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return re.sub(r"[\W_]+", "", text)
+
+
+class _TrieNode:
+    __slots__ = ("children", "uuids")
+
+    def __init__(self):
+        self.children = {}
+        self.uuids = set()
+
+
+class ArtifactNameIndex:
+    """In-memory normalized name+alias → UUID index with a prefix trie.
+
+    Built from Compliance_Artifacts at startup, updated incrementally on every
+    kb_compliance_save and fully reloaded every NAME_INDEX_REFRESH_INTERVAL
+    seconds to pick up writes from other workers.
+    """
+
+    def __init__(self, refresh_interval: float = NAME_INDEX_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._root = _TrieNode()
+        self._exact = {}          # key -> set(uuid)
+        self._keys_of = {}        # uuid -> [key]
+        self._names = {}          # uuid -> official name
+        self._hashes = {}         # uuid -> content_hash
+        self._task: asyncio.Task | None = None
+        self._stats = {"loads": 0, "resolve_hits": 0, "resolve_misses": 0, "ambiguous": 0, "updates": 0}
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        """Whether any artifact has this exact name or alias (ambiguous names included)."""
+        return bool(self._exact.get(normalize_name(name)))
+
+    def _insert_key(self, key: str, uuid: str):
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+        node.uuids.add(uuid)
+        self._exact.setdefault(key, set()).add(uuid)
+
+    def _remove_key(self, key: str, uuid: str):
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return
+        node.uuids.discard(uuid)
+        uuids = self._exact.get(key)
+        if uuids is not None:
+            uuids.discard(uuid)
+            if not uuids:
+                del self._exact[key]
+
+    def add(self, uuid: str, name: str, aliases: list | None = None, content_hash: str | None = None):
+        """Index (or re-index) one artifact's name and aliases."""
+        uuid = str(uuid)
+        for key in self._keys_of.pop(uuid, []):
+            self._remove_key(key, uuid)
+        keys = list(dict.fromkeys(k for k in (normalize_name(n) for n in [name, *(aliases or [])]) if k))
+        for key in keys:
+            self._insert_key(key, uuid)
+        self._keys_of[uuid] = keys
+        self._names[uuid] = name
+        if content_hash:
+            self._hashes[uuid] = content_hash
+        self._stats["updates"] += 1
+
+    def resolve(self, name: str) -> str | None:
+        """UUID of the single artifact whose name or alias matches exactly (None if absent or ambiguous)."""
+        uuids = self._exact.get(normalize_name(name))
+        if not uuids:
+            self._stats["resolve_misses"] += 1
+            return None
+        if len(uuids) > 1:
+            self._stats["ambiguous"] += 1
+            return None
+        self._stats["resolve_hits"] += 1
+        return next(iter(uuids))
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """Artifacts whose name or alias starts with ``prefix``: [(name, uuid)]."""
+        node = self._root
+        for char in normalize_name(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        found, stack = [], [node]
+        while stack and len(found) < limit:
+            current = stack.pop()
+            for uuid in sorted(current.uuids):
+                if uuid not in found:
+                    found.append(uuid)
+            stack.extend(current.children[c] for c in sorted(current.children, reverse=True))
+        return [(self._names[uuid], uuid) for uuid in found[:limit]]
+
+    def content_hash(self, uuid: str) -> str | None:
+        return self._hashes.get(str(uuid))
+
+    async def load(self):
+        """Rebuild the index from every artifact's name, aliases and content hash."""
+        from .knowledgebase_service import _get_weaviate_client
+        client = await _get_weaviate_client()
+        collection = client.collections.get(COMPLIANCE_COLLECTION)
+        fresh = ArtifactNameIndex(self.refresh_interval)
+        async for obj in collection.iterator(return_properties=["name", "aliases", "content_hash"]):
+            props = obj.properties
+            fresh.add(str(obj.uuid), props.get("name") or "", props.get("aliases"), props.get("content_hash"))
+        self._root, self._exact, self._keys_of = fresh._root, fresh._exact, fresh._keys_of
+        self._names, self._hashes = fresh._names, fresh._hashes
+        self._stats["loads"] += 1
+        print(f"📇 Compliance name index loaded: {len(self)} artifacts")
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.load()
+            except Exception as e:
+                print(f"⚠️ Compliance name index refresh failed: {e}")
+
+    async def start(self):
+        """Build the index (app startup) and start the periodic reload."""
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"⚠️ Compliance name index unavailable: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["artifacts"] = len(self)
+        stats["keys"] = len(self._exact)
+        return stats
+
+
+artifact_name_index = ArtifactNameIndex()
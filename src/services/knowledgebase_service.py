@@ -1,196 +1,443 @@
 """
 Knowledge base service functions - Final implementation
 """
+import asyncio
+import hashlib
 import json
 import os
 import time
 from datetime import datetime, timezone
 
-import openai
-import voyageai
 from dotenv import load_dotenv
 import weaviate
-from weaviate import WeaviateClient
+from weaviate import WeaviateAsyncClient
 from weaviate.auth import AuthApiKey
 from weaviate.classes import query as wq
 from weaviate.connect import ConnectionParams, ProtocolParams
-from pydantic import BaseModel
-from typing import List, Dict
+from weaviate.util import generate_uuid5
 from src.config.schemas import ComplianceArtifact
+from .query_planner import plan_query, rule_based_plan, jurisdiction_regions
+from .whitelist_index import whitelist_snapshot
+from .kb_batch_writer import CLIENT_SIDE_VECTORS, artifact_writer
+from .embedding_service import embed_query, embed_texts
+from .kb_name_index import artifact_name_index
+from .kb_artifact_cache import artifact_cache
+from .cache_service import SingleFlight
+from .openai_service import get_openai_client
+
+# Application-scoped async Weaviate client shared by every knowledge-base call.
+# Created in the FastAPI lifespan (kb_connect / kb_close) and lazily on first use.
+_weaviate_client: WeaviateAsyncClient | None = None
+_weaviate_lock = asyncio.Lock()
+_health_task: asyncio.Task | None = None
+
+KB_HEALTH_CHECK_INTERVAL = float(os.getenv("WEAVIATE_HEALTH_CHECK_INTERVAL", "30"))
+# Consecutive failed health checks before the shared client is replaced
+KB_HEALTH_FAILURE_THRESHOLD = int(os.getenv("WEAVIATE_HEALTH_FAILURE_THRESHOLD", "3"))
+# Seconds a replaced client stays open so in-flight queries on it can finish
+KB_RECONNECT_GRACE = float(os.getenv("WEAVIATE_RECONNECT_GRACE", "30"))
+_consecutive_health_failures = 0
+
+# Connection reuse metrics
+_client_stats = {
+    "connects": 0,
+    "reconnects": 0,
+    "checkouts": 0,
+    "health_checks": 0,
+    "health_failures": 0,
+}
+
+
+def _new_weaviate_client() -> WeaviateAsyncClient:
+    """Build (but do not connect) an async Weaviate client from environment configuration.
 
-def _get_weaviate_client():
-    """Get connected Weaviate client using environment configuration.
-    
-    Returns:
-        WeaviateClient: Connected Weaviate client instance
-        
     Raises:
         ValueError: If required environment variables are missing
     """
     weaviate_api_key = os.getenv("WEAVIATE_API_KEY")
     endpoint = os.getenv("WEAVIATE_URL")
-    
+
     if not weaviate_api_key or not endpoint:
         raise ValueError("Missing WEAVIATE_API_KEY or WEAVIATE_URL environment variables")
-    
-    client = WeaviateClient(
+
+    return WeaviateAsyncClient(
         connection_params=ConnectionParams(
             http=ProtocolParams(host=endpoint, port=8080, secure=False),
             grpc=ProtocolParams(host=endpoint, port=50051, secure=False)
         ),
         auth_client_secret=AuthApiKey(weaviate_api_key),
     )
-    client.connect()
+
+
+async def _close_later(client: WeaviateAsyncClient, delay: float):
+    """Close a replaced client once the queries already running on it had time to finish."""
+    await asyncio.sleep(delay)
+    try:
+        await client.close()
+    except Exception:
+        pass
+
+
+async def _connect(reconnect: bool = False) -> WeaviateAsyncClient:
+    """(Re)create the shared client. Caller must hold ``_weaviate_lock``.
+
+    The new client is connected and swapped in before the old one is closed,
+    so queries in flight on the old client are not aborted.
+    """
+    global _weaviate_client
+    client = _new_weaviate_client()
+    await client.connect()
+    old, _weaviate_client = _weaviate_client, client
+    if old is not None:
+        asyncio.create_task(_close_later(old, KB_RECONNECT_GRACE if old.is_connected() else 0))
+    _client_stats["reconnects" if reconnect else "connects"] += 1
+    print(f"🔌 Weaviate async client {'reconnected' if reconnect else 'connected'}")
     return client
 
-async def kb_domain_lookup(query: str):
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-    # Initialize OpenAI
-    openai.api_key = OPENAI_API_KEY
-
-    # VoyageAI API key and client
-    VOYAGE_API_KEY = os.getenv("VOYAGE_API_KEY")
-    voyage_client = voyageai.Client(VOYAGE_API_KEY)
-
-    # ─── 2.  Controlled vocab lists (for the prompt & validation) ─────────────
-    ORG_TYPES = [
-        "government",
-        "standards_org",
-        "accreditation_body",
-        "certification_body",
-        "inspection_body",
-        "testing_lab",
-        "consulting_firm",
-    ]
-    LEVELS = ["international", "supranational", "national", "subnational", "local"]
-    COMPLIANCE = [
-        "toy_safety",
-        "electrical_electronics",
-        "chemical_substances",
-        "food_agriculture",
-        "medical_healthcare",
-        "automotive_transport",
-        "industrial_machinery",
-        "construction_building",
-        "environmental",
-        "occupational_safety",
-        "information_security",
-        "energy_utilities",
-        "textiles_apparel",
-        "aerospace_defense",
-        "consumer_products",
-    ]
 
-    # ─── 3.  Prompt & JSON schema for GPT-4o-mini ─────────────────────────────
-    PLAN_PROMPT = f"""
-    You are a Weaviate query planner for trade‑compliance search.
-
-    Guidelines
-    * Extract every relevant token for **each** facet; leave an array empty if nothing is clearly implied.
-    * Allowed vocabularies:
-        org_type = {ORG_TYPES}
-        level    = {LEVELS}
-        compliance_domain = {COMPLIANCE}
-    * Do **not** invent new tokens or fields.
-    * Keep JSON minified: no trailing commas, no extra keys, no additional whitespace outside strings.
-    Guidelines:
-    * org_type: list **every** organization type implied (e.g., certification_body, inspection_body).
-    * jurisdiction: include **each** ISO-3166-1 α-2 code for origin and destination; use GLOBAL for worldwide scope.
-    * If any EU member state is included, also include "EU" in the jurisdiction array.
-    * level: include each governance level implied (international, national, local, etc.).
-    * compliance_domain: include **all** compliance domain referenced or implied (e.g., food_agriculture, chemical_substances).
-    * Build vector_query by stripping filler words and focusing on core concepts (e.g., 'export honey certifications India US').
-    * Only use allowed tokens; do not invent new ones.
-    * Do NOT add any fields beyond the three specified.
-    * Ensure the JSON is strictly formatted with no extra whitespace or properties.
-
-    Example
-    User: "certifications to export honey from India to US"
-    Return:
-    {{
-    "keywords": {{
-        "jurisdiction": ["IN","US"],
-        "org_type": ["certification_body", "government", "standards_org"],
-        "level": ["international", "national"],
-        "compliance_domain": ["food_agriculture"]
-    }}
-    }}
+async def _get_weaviate_client() -> WeaviateAsyncClient:
+    """Get the shared, connected async Weaviate client.
+
+    Returns:
+        WeaviateAsyncClient: Connected client reused across requests (do not close it)
+
+    Raises:
+        ValueError: If required environment variables are missing
     """
+    client = _weaviate_client
+    if client is None or not client.is_connected():
+        async with _weaviate_lock:
+            client = _weaviate_client
+            if client is None or not client.is_connected():
+                client = await _connect(reconnect=client is not None)
+    _client_stats["checkouts"] += 1
+    return client
 
-    SCHEMA = {
-        "type": "object",
-        "properties": {
-            "keywords": {
-                "type": "object",
-                "properties": {
-                    "jurisdiction": {"type": "array", "items": {"type": "string"}},
-                    "org_type": {"type": "array", "items": {"type": "string"}},
-                    "level": {"type": "array", "items": {"type": "string"}},
-                    "compliance_domain": {"type": "array", "items": {"type": "string"}},
-                },
-                "required": [],
-            },
-        },
-        "required": ["vector_query", "keywords"],
-        "additionalProperties": False,
-    }
 
-    class Plan(BaseModel):
-        keywords: Dict[str, List[str]]
+async def kb_health_check() -> bool:
+    """Ping Weaviate with the shared client.
 
-    def _plan(query: str) -> Plan:
-        """Call GPT‑4o to get structured plan."""
-        resp = openai.chat.completions.create(
-            model="gpt-4o",
-            temperature=0,
-            response_format={
-                "type": "json_schema",
-                "json_schema": {"name": "plan", "schema": SCHEMA},
-            },
-            messages=[
-                {"role": "system", "content": PLAN_PROMPT},
-                {"role": "user", "content": query},
-            ],
-        )
-        return Plan.model_validate_json(resp.choices[0].message.content)
+    The client is replaced only after KB_HEALTH_FAILURE_THRESHOLD consecutive
+    failures (or immediately if it is missing or disconnected), so a single
+    transient failure does not disturb running queries.
+    """
+    global _consecutive_health_failures
+    _client_stats["health_checks"] += 1
+    client = _weaviate_client
+    connected = client is not None and client.is_connected()
+    try:
+        if connected and await client.is_ready():
+            _consecutive_health_failures = 0
+            return True
+    except Exception as e:
+        print(f"⚠️ Weaviate health check failed: {e}")
+    _client_stats["health_failures"] += 1
+    _consecutive_health_failures += 1
+    if connected and _consecutive_health_failures < KB_HEALTH_FAILURE_THRESHOLD:
+        return False
+    try:
+        async with _weaviate_lock:
+            await _connect(reconnect=True)
+        _consecutive_health_failures = 0
+        return True
+    except Exception as e:
+        print(f"❌ Weaviate reconnect failed: {e}")
+        return False
 
-    plan = _plan(query)
-    property_keywords = {k: v for k, v in plan.keywords.items() if v}
 
-    # Weaviate client
-    client = _get_weaviate_client()
+async def _health_loop():
+    while True:
+        await asyncio.sleep(KB_HEALTH_CHECK_INTERVAL)
+        await kb_health_check()
 
-    whitelist = client.collections.get("URL_Whitelist")
+
+async def kb_connect():
+    """Open the shared Weaviate client and start the periodic health check (app startup)."""
+    global _health_task
+    try:
+        await _get_weaviate_client()
+    except Exception as e:
+        print(f"⚠️ Weaviate unavailable at startup, will retry on first use: {e}")
+    if _health_task is None:
+        _health_task = asyncio.create_task(_health_loop())
+
+
+async def kb_close():
+    """Stop the health check and close the shared Weaviate client (app shutdown)."""
+    global _weaviate_client, _health_task
+    if _health_task is not None:
+        _health_task.cancel()
+        _health_task = None
+    async with _weaviate_lock:
+        if _weaviate_client is not None:
+            await _weaviate_client.close()
+            _weaviate_client = None
+
+
+def kb_client_stats() -> dict:
+    """Connection reuse metrics for the shared Weaviate client."""
+    stats = dict(_client_stats)
+    stats["reused"] = stats["checkouts"] - stats["connects"] - stats["reconnects"]
+    stats["connected"] = bool(_weaviate_client and _weaviate_client.is_connected())
+    return stats
+
+# Planner facets used as a ranking boost: a filtered and an unfiltered search run
+# concurrently and are rank-fused, so a wrong facet from the query text cannot drop
+# the right hit. The cost is a second Weaviate query per faceted lookup (latency
+# is the slower of the two, not their sum); set to false for one unfiltered query.
+FACET_FILTERS = os.getenv("KB_FACET_FILTERS", "true").lower() == "true"
+WHITELIST_FILTER_FACETS = ["jurisdiction", "compliance_domain"]
+
+
+def _whitelist_facets(keywords: dict) -> dict:
+    """Facet values used to filter URL_Whitelist (worldwide bodies always pass the jurisdiction facet)."""
+    facets = {k: list(keywords[k]) for k in WHITELIST_FILTER_FACETS if keywords.get(k)}
+    if "jurisdiction" in facets and "GLOBAL" not in facets["jurisdiction"]:
+        facets["jurisdiction"].append("GLOBAL")
+    return facets
+
+
+def _facet_filter(facets: dict):
+    """contains_any filter per facet, combined with AND (None when there are no facets)."""
+    filters = [wq.Filter.by_property(prop).contains_any(values) for prop, values in facets.items()]
+    if not filters:
+        return None
+    return filters[0] if len(filters) == 1 else wq.Filter.all_of(filters)
+
+
+def _fuse_ranked(ranked_lists: list, limit: int) -> list:
+    """Reciprocal-rank fusion of plain ranked lists (ties keep first-seen order).
+
+    Facets are planned from the query text and can be wrong, so filtered hits
+    are fused with unfiltered ones rather than replacing them: a facet match
+    only boosts an item.
+    """
+    scores = {}
+    for items in ranked_lists:
+        for rank, item in enumerate(items, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (RRF_K + rank)
+    return sorted(scores, key=scores.get, reverse=True)[:limit]
+
+
+_domain_lookup_flight = SingleFlight()
+
+
+async def kb_domain_lookup(query: str, limit: int = 5):
+    """Whitelisted domains for a query; concurrent identical lookups share one call."""
+    return await _domain_lookup_flight.do((query, limit), _kb_domain_lookup, query, limit)
+
+
+def domain_lookup_flight_stats() -> dict:
+    return _domain_lookup_flight.stats()
+
+
+async def _kb_domain_lookup(query: str, limit: int = 5):
+    plan, plan_source = await plan_query(query)
+    print(f"🧭 Query plan ({plan_source}): {plan.keywords}")
+    property_keywords = {k: v for k, v in plan.keywords.items() if v}
+    facets = _whitelist_facets(property_keywords) if FACET_FILTERS else {}
 
     # Build BM25 query: natural‑language sentence + facet keywords
     bm25_query = f"{query} " + " ".join(sum(property_keywords.values(), []))
-    # bm25_props = list(property_keywords.keys())
-    # print(bm25_props)
-    response = whitelist.query.hybrid(
-        query=bm25_query,
-        # vector=vector_embed,
-        alpha=0.5,
-        limit=5,
-        # query_properties=bm25_props,
-        return_properties=["domain"],
-        return_metadata=wq.MetadataQuery(score=True),
-    )
+
+    # Client-side query embedding (served from the embedding cache on repeats); without
+    # it Weaviate vectorizes the query and the snapshot ranks by BM25 only
+    vector_embed = await embed_query(query) if CLIENT_SIDE_VECTORS else None
+
+    # Serve from the in-process snapshot when loaded; Weaviate is the fallback
+    if whitelist_snapshot.ready:
+        domain_list = whitelist_snapshot.search(bm25_query, vector=vector_embed, alpha=0.5, limit=limit)
+        if facets:
+            filtered = whitelist_snapshot.search(bm25_query, vector=vector_embed, alpha=0.5, limit=limit, facets=facets)
+            domain_list = _fuse_ranked([filtered, domain_list], limit)
+        if domain_list:
+            return domain_list
+
+    # Shared Weaviate client
+    client = await _get_weaviate_client()
+
+    whitelist = client.collections.get("URL_Whitelist")
+
+    async def _search(filters):
+        response = await whitelist.query.hybrid(
+            query=bm25_query,
+            vector=vector_embed,
+            alpha=0.5,
+            limit=limit,
+            filters=filters,
+            return_properties=["domain"],
+            return_metadata=wq.MetadataQuery(score=True),
+        )
+        return [obj.properties["domain"] for obj in response.objects]
 
     # Collect domains
-    domain_list = [obj.properties["domain"] for obj in response.objects]
-    client.close()
-    return domain_list
+    domain_filter = _facet_filter(facets)
+    if domain_filter is None:
+        return await _search(None)
+    filtered, unfiltered = await asyncio.gather(_search(domain_filter), _search(None))
+    return _fuse_ranked([filtered, unfiltered], limit)
+
+# Stored Compliance_Artifacts properties
+ARTIFACT_PROPERTIES = [
+    "artifact_type", "name", "aliases", "issuing_body", "region", "mandatory",
+    "validity_period_months", "overview", "full_description", "legal_reference",
+    "domain_tags", "scope_tags", "harmonized_standards", "fee", "application_process",
+    "official_link", "updated_at", "sources", "content_hash",
+]
+
+# Default projection per calling agent (None = every property)
+COMPLIANCE_LOOKUP_FIELDS = {
+    # Everything a flashcard can show; drops full_description, sources and content_hash
+    "flashcard": [
+        "name", "aliases", "artifact_type", "issuing_body", "region", "mandatory",
+        "validity_period_months", "overview", "legal_reference", "domain_tags", "scope_tags",
+        "harmonized_standards", "fee", "application_process", "official_link", "updated_at",
+    ],
+    "discovery": [
+        "name", "aliases", "artifact_type", "issuing_body", "region", "mandatory", "scope_tags", "overview",
+    ],
+    "ingestion": None,
+}
+
+# Serialized size of lookup results per projection profile
+_projection_stats = {}
+
+
+def _project_properties(return_properties: list | None) -> list | None:
+    """Validate a caller-selected projection against the stored properties."""
+    if not return_properties:
+        return None
+    fields = [p for p in return_properties if p in ARTIFACT_PROPERTIES]
+    return fields or None
+
+
+def serialize_artifacts(artifacts: list, profile: str | None = None) -> str:
+    """Compact, deterministic JSON for compliance lookup results.
+
+    Keys are sorted, separators carry no whitespace and empty values are
+    dropped, so identical results always serialize to identical strings.
+    """
+    compact = [
+        {k: v for k, v in artifact.items() if v is not None and v != [] and v != ""}
+        for artifact in artifacts
+    ]
+    payload = json.dumps(compact, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    if profile:
+        stats = _projection_stats.setdefault(profile, {"calls": 0, "objects": 0, "chars": 0})
+        stats["calls"] += 1
+        stats["objects"] += len(compact)
+        stats["chars"] += len(payload)
+    return payload
+
+
+def projection_stats() -> dict:
+    """Approximate tokens per returned artifact for each agent profile (≈4 chars per token).
+
+    Savings are relative to the full-property "ingestion" profile.
+    """
+    result = {}
+    for profile, stats in _projection_stats.items():
+        per_object = stats["chars"] / 4 / stats["objects"] if stats["objects"] else 0.0
+        result[profile] = dict(stats, tokens_per_object=round(per_object, 1))
+    full = result.get("ingestion", {}).get("tokens_per_object")
+    if full:
+        for stats in result.values():
+            stats["token_savings"] = round(1 - stats["tokens_per_object"] / full, 3)
+    return result
+
+
+# Reciprocal-rank fusion constant
+RRF_K = 60
+
+
+def _rrf_fuse(result_lists: list, limit: int) -> list:
+    """Fuse ranked result lists with reciprocal-rank fusion, deduplicated by UUID."""
+    fused = {}
+    scores = {}
+    for results in result_lists:
+        for rank, artifact in enumerate(results, start=1):
+            uuid = artifact["uuid"]
+            fused.setdefault(uuid, artifact)
+            scores[uuid] = scores.get(uuid, 0.0) + 1.0 / (RRF_K + rank)
+    ranked = sorted(fused, key=lambda u: scores[u], reverse=True)[:limit]
+    return [dict(fused[u], score=round(scores[u], 4)) for u in ranked]
+
+
+async def kb_compliance_resolve(name: str, return_properties: list | None = None):
+    """Resolve an exact scheme name or alias to its artifact without a hybrid search.
 
-async def kb_compliance_lookup(query: str, search_limit: int = 10):
-    # VoyageAI API key and client
-    VOYAGE_API_KEY = os.getenv("VOYAGE_API_KEY")
-    voyage_client = voyageai.Client(VOYAGE_API_KEY)
+    Args:
+        name: Scheme name or alias (case, spacing and punctuation are ignored)
+        return_properties: Properties to return (None = all)
+
+    Returns:
+        dict | None: The artifact (``uuid``, ``score`` = 1.0 and properties), or None if there is no unique match
+    """
+    uuid = artifact_name_index.resolve(name)
+    if uuid is None:
+        return None
+    fields = _project_properties(return_properties)
+    cached = artifact_cache.get_artifact(uuid, fields)
+    if cached is not None:
+        return cached
+    client = await _get_weaviate_client()
+    collection = client.collections.get("Compliance_Artifacts")
+    # Fetch every property so the cached entry serves any projection
+    obj = await collection.query.fetch_object_by_id(uuid)
+    if obj is None:
+        return None
+    artifact_cache.put_artifact(uuid, obj.properties)
+    return artifact_cache.get_artifact(uuid, fields)
+
+
+async def kb_compliance_lookup(query: str | list, search_limit: int = 10, return_properties: list | None = None,
+                               exact_first: bool = False):
+    """Hybrid search over Compliance_Artifacts.
+
+    Several queries (e.g. rephrasings) run concurrently over the shared client
+    and are fused with reciprocal-rank fusion, deduplicated by UUID.
+
+    Args:
+        query: English search string, or a list of them
+        search_limit: Maximum number of results
+        return_properties: Properties to return (None = all)
+        exact_first: Return the artifact directly when a single query is an exact name/alias
+
+    Returns:
+        list: One dict per hit with ``uuid``, ``score`` and the projected properties
+    """
+    queries = [query] if isinstance(query, str) else [q for q in dict.fromkeys(query) if q]
+    if exact_first and len(queries) == 1:
+        artifact = await kb_compliance_resolve(queries[0], return_properties)
+        if artifact is not None:
+            return [artifact]
 
-    client = _get_weaviate_client()
+    # Read-through query cache, invalidated by every save
+    fields = _project_properties(return_properties)
+    cache_key = (tuple(queries), search_limit, tuple(fields or ()))
+    cached = artifact_cache.get_query(cache_key)
+    if cached is not None:
+        return cached
+    version = artifact_cache.version
+
+    if len(queries) == 1:
+        results = await _compliance_hybrid(queries[0], search_limit, return_properties)
+    else:
+        vectors = await embed_texts(queries, input_type="query") if CLIENT_SIDE_VECTORS else [None] * len(queries)
+        result_lists = await asyncio.gather(*[
+            _compliance_hybrid(q, search_limit, return_properties, vector=v)
+            for q, v in zip(queries, vectors)
+        ])
+        results = _rrf_fuse(result_lists, search_limit)
+    artifact_cache.put_query(cache_key, results, version)
+    return results
+
+
+async def _compliance_hybrid(query: str, search_limit: int, return_properties: list | None, vector=None):
+    client = await _get_weaviate_client()
     whitelist = client.collections.get("Compliance_Artifacts")
 
-    def _polish_query(query):
+    async def _polish_query(query):
         system_prompt = """
         You are “QueryRefiner-Pro,” a specialist that transforms messy, natural-language user questions into crisp,
     high-recall BM25 search strings for our **Compliance_Artifacts** vector database.
@@ -237,10 +484,7 @@ async def kb_compliance_lookup(query: str, search_limit: int = 10):
     OUTPUT: `lithium batteries environment China Mainland`
     """
         # 2a. Refine the search query using OpenAI
-        OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-        openai.api_key = OPENAI_API_KEY
-
-        resp = openai.chat.completions.create(
+        resp = await get_openai_client().chat.completions.create(
             model="gpt-4o",
             temperature=0,
             messages=[
@@ -252,26 +496,91 @@ async def kb_compliance_lookup(query: str, search_limit: int = 10):
     
     bm25_query = query
     print(f"🍎 Query: {bm25_query}")
-    try:
-        response = whitelist.query.hybrid(
+    if vector is None and CLIENT_SIDE_VECTORS:
+        vector = await embed_query(query)
+    vector_embed = vector
+
+    # Region filter from the rule-based planner (no LLM call on this path); used as
+    # a boost only, since the jurisdiction in the query may not be the scheme's region
+    region_filter = None
+    if FACET_FILTERS:
+        facets, _ = rule_based_plan(query)
+        regions = jurisdiction_regions(facets.keywords.get("jurisdiction", []))
+        if regions:
+            region_filter = wq.Filter.any_of([wq.Filter.by_property("region").equal(r) for r in regions])
+
+    async def _search(filters):
+        response = await whitelist.query.hybrid(
             query=bm25_query,
-            # vector=vector_embed,
+            vector=vector_embed,
             alpha=0.5,
             limit=search_limit,
             # query_properties=bm25_props,
+            filters=filters,
+            return_properties=_project_properties(return_properties),
             return_metadata=wq.MetadataQuery(score=True),
         )
         # Print only the names from the response objects
         # for obj in response.objects:
         #     if hasattr(obj, 'properties') and 'name' in obj.properties:
         #         print(f"{obj.properties['name']} (Score: {round(obj.metadata.score, 3)})")
-        return response
-    finally:
-        client.close()
+        return [
+            {"uuid": str(obj.uuid), "score": round(obj.metadata.score or 0.0, 4), **obj.properties}
+            for obj in response.objects
+        ]
+
+    if region_filter is None:
+        return await _search(None)
+    filtered, unfiltered = await asyncio.gather(_search(region_filter), _search(None))
+    return _rrf_fuse([filtered, unfiltered], search_limit)
+
+def _artifact_properties(artifact: ComplianceArtifact, updated_at: datetime | None = None) -> dict:
+    """Convert a ComplianceArtifact to the Weaviate property dictionary.
+
+    ``updated_at`` defaults to now (a fresh save); imports pass the record's own timestamp.
+    """
+    updated_at = updated_at or datetime.now(timezone.utc)
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return {
+        "artifact_type": artifact.artifact_type,
+        "name": artifact.name,
+        "aliases": artifact.aliases or [],
+        "issuing_body": artifact.issuing_body,
+        "region": artifact.region,
+        "mandatory": artifact.mandatory,
+        "validity_period_months": artifact.validity_period_months,
+        "overview": artifact.overview,
+        "full_description": artifact.full_description,
+        "legal_reference": artifact.legal_reference,
+        "domain_tags": artifact.domain_tags,
+        "scope_tags": artifact.scope_tags or [],
+        "harmonized_standards": artifact.harmonized_standards or [],
+        "fee": artifact.fee,
+        "application_process": artifact.application_process,
+        "official_link": str(artifact.official_link),
+        "updated_at": updated_at.isoformat(),
+        "sources": [str(source) for source in artifact.sources],
+        "content_hash": _artifact_hash(artifact)
+    }
+
+def _artifact_hash(artifact: ComplianceArtifact) -> str:
+    """Stable hash of the artifact content (every field except updated_at)."""
+    content = artifact.model_dump(mode="json", exclude={"updated_at"})
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _artifact_uuid(artifact: ComplianceArtifact) -> str:
+    """Deterministic UUID based on name and issuing_body for deduplication."""
+    return str(generate_uuid5(f"{artifact.name}_{artifact.issuing_body}"))
 
 async def kb_compliance_save(artifact: ComplianceArtifact, uuid: str = None):
     """Save a compliance artifact to the Weaviate knowledge base.
-    
+
+    The write is buffered by the shared batch writer and flushed together with
+    other saves; this call returns once its own object has been written.
+    Saves whose content hash matches the stored object are skipped.
+
     Args:
         artifact: ComplianceArtifact object with all required fields
         uuid: Optional UUID string. If provided, updates existing object; if None, creates new object
@@ -282,58 +591,14 @@ async def kb_compliance_save(artifact: ComplianceArtifact, uuid: str = None):
     Raises:
         Exception: If save operation fails
     """
-    # Initialize Weaviate client using extracted helper function
-    client = _get_weaviate_client()
-    
     try:
-        # Get the compliance artifacts collection
-        compliance_collection = client.collections.get("Compliance_Artifacts")
-        
         # Convert ComplianceArtifact to dictionary for Weaviate
-        properties = {
-            "artifact_type": artifact.artifact_type,
-            "name": artifact.name,
-            "aliases": artifact.aliases or [],
-            "issuing_body": artifact.issuing_body,
-            "region": artifact.region,
-            "mandatory": artifact.mandatory,
-            "validity_period_months": artifact.validity_period_months,
-            "overview": artifact.overview,
-            "full_description": artifact.full_description,
-            "legal_reference": artifact.legal_reference,
-            "domain_tags": artifact.domain_tags,
-            "scope_tags": artifact.scope_tags or [],
-            "harmonized_standards": artifact.harmonized_standards or [],
-            "fee": artifact.fee,
-            "application_process": artifact.application_process,
-            "official_link": str(artifact.official_link),
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-            "sources": [str(source) for source in artifact.sources]
-        }
-        
-        if uuid:
-            # Update existing object
-            compliance_collection.data.update(
-                uuid=uuid,
-                properties=properties
-            )
-            result_uuid = uuid
-        else:
-            # Create new object - let Weaviate generate UUID or use deterministic UUID
-            from weaviate.util import generate_uuid5
-            
-            # Generate deterministic UUID based on name and issuing_body for deduplication
-            uuid_data = f"{artifact.name}_{artifact.issuing_body}"
-            generated_uuid = generate_uuid5(uuid_data)
-            
-            result_uuid = compliance_collection.data.insert(
-                properties=properties,
-                uuid=generated_uuid
-            )
-            
+        properties = _artifact_properties(artifact)
+        result_uuid = uuid or _artifact_uuid(artifact)
+        result_uuid = await artifact_writer.submit(result_uuid, properties)
+        artifact_name_index.add(result_uuid, artifact.name, artifact.aliases, properties["content_hash"])
+        artifact_cache.on_write(result_uuid, properties)
     except Exception as e:
         raise Exception(f"Failed to save compliance artifact: {str(e)}")
-    finally:
-        client.close()
     
-    return result_uuid
\ No newline at end of file
+    return result_uuid
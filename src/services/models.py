@@ -62,4 +62,12 @@ class ConversationMemory(Base):
     summary = Column(Text)
     up_to_message_order = Column(Integer, nullable=False)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    summarization_strategy = Column(String) 
\ No newline at end of file
+    summarization_strategy = Column(String) 
+
+class CacheEntry(Base):
+    __tablename__ = 'service_cache'
+    namespace = Column(String, primary_key=True)
+    cache_key = Column(String, primary_key=True)
+    value = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
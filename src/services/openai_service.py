@@ -0,0 +1,47 @@
+"""
+Shared async OpenAI client for non-agent LLM calls (moderation, query planning, summarization)
+"""
+import os
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "50"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+
+# Application-scoped client with a pooled HTTP connection.
+# Created in the FastAPI lifespan (openai_connect / openai_close) and lazily on first use.
+_openai_client: AsyncOpenAI | None = None
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Get the shared AsyncOpenAI client (do not close it)."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=OPENAI_TIMEOUT,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_CONNECTIONS,
+                ),
+            ),
+        )
+    return _openai_client
+
+
+async def openai_connect():
+    """Create the shared OpenAI client (app startup)."""
+    try:
+        get_openai_client()
+    except Exception as e:
+        print(f"⚠️ OpenAI client unavailable at startup, will retry on first use: {e}")
+
+
+async def openai_close():
+    """Close the shared OpenAI client (app shutdown)."""
+    global _openai_client
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
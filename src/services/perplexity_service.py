@@ -1,15 +1,262 @@
 """
 Perplexity API service functions
 """
+import asyncio
+import hashlib
+import json
 import os
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import aiohttp
 from src.config.prompts import PERPLEXITY_PROMPT
+from .cache_service import PersistentCache
 
+PERPLEXITY_MODEL = os.getenv("PERPLEXITY_MODEL", "sonar-pro")
+# Stream completions when the caller wants progress (search_progress events)
+PERPLEXITY_STREAM = os.getenv("PERPLEXITY_STREAM", "true").lower() == "true"
+PERPLEXITY_POOL_SIZE = int(os.getenv("PERPLEXITY_POOL_SIZE", "20"))
+PERPLEXITY_KEEPALIVE = float(os.getenv("PERPLEXITY_KEEPALIVE", "60"))
+PERPLEXITY_CONNECT_TIMEOUT = float(os.getenv("PERPLEXITY_CONNECT_TIMEOUT", "5"))
+PERPLEXITY_READ_TIMEOUT = float(os.getenv("PERPLEXITY_READ_TIMEOUT", "90"))
 
-async def perplexity_search(query: str, domains: list = None):
+# Application-scoped HTTP session shared by every Perplexity call.
+# Created in the FastAPI lifespan (perplexity_connect / perplexity_close) and lazily on first use.
+_session: aiohttp.ClientSession | None = None
+
+# Connection reuse metrics, fed by the session's trace hooks
+_pool_stats = {"requests": 0, "connections_created": 0, "connections_reused": 0, "dns_cache_hits": 0}
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    def count(key):
+        async def hook(session, context, params):
+            _pool_stats[key] += 1
+        return hook
+
+    trace = aiohttp.TraceConfig()
+    trace.on_request_start.append(count("requests"))
+    trace.on_connection_create_end.append(count("connections_created"))
+    trace.on_connection_reuseconn.append(count("connections_reused"))
+    trace.on_dns_cache_hit.append(count("dns_cache_hits"))
+    return trace
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Get the shared Perplexity session (keep-alive pool; do not close it)."""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=PERPLEXITY_POOL_SIZE,
+            keepalive_timeout=PERPLEXITY_KEEPALIVE,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=PERPLEXITY_CONNECT_TIMEOUT,
+            sock_read=PERPLEXITY_READ_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=[_trace_config()])
+    return _session
+
+
+async def perplexity_connect():
+    """Open the shared Perplexity session (app startup)."""
+    _get_session()
+
+
+async def perplexity_close():
+    """Close the shared Perplexity session (app shutdown)."""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+PERPLEXITY_RATE_PER_MINUTE = float(os.getenv("PERPLEXITY_RATE_PER_MINUTE", "50"))
+PERPLEXITY_BURST = int(os.getenv("PERPLEXITY_BURST", "5"))
+PERPLEXITY_MAX_QUEUE = int(os.getenv("PERPLEXITY_MAX_QUEUE", "100"))
+PERPLEXITY_MAX_RETRIES = int(os.getenv("PERPLEXITY_MAX_RETRIES", "3"))
+PERPLEXITY_BACKOFF_BASE = float(os.getenv("PERPLEXITY_BACKOFF_BASE", "1.0"))
+PERPLEXITY_BACKOFF_MAX = 30.0
+
+
+class RateLimitQueueFull(Exception):
+    """Raised when too many calls are already waiting for the rate limiter."""
+
+
+class TokenBucket:
+    """Token-bucket limiter with a bounded FIFO wait queue.
+
+    Tokens refill at ``rate_per_minute``; at most ``burst`` are banked. The
+    rate adapts: a 429 halves it (down to 10% of the quota) and pauses the
+    bucket for Retry-After, each success restores 5% of the quota.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, max_queue: int):
+        self.quota = rate_per_minute / 60
+        self.rate = self.quota
+        self.burst = burst
+        self.max_queue = max_queue
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = 0
+        self._lock = asyncio.Lock()
+        self._stats = {"acquired": 0, "queued": 0, "rejected": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self._waiters >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise RateLimitQueueFull(f"{self._waiters} Perplexity calls already waiting")
+        self._waiters += 1
+        started = time.monotonic()
+        try:
+            # The lock keeps waiters in FIFO order
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self._paused_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    await asyncio.sleep(max(self._paused_until - now, (1 - self._tokens) / self.rate))
+        finally:
+            self._waiters -= 1
+        waited = time.monotonic() - started
+        self._stats["acquired"] += 1
+        if waited > 0.001:
+            self._stats["queued"] += 1
+            self._stats["wait_seconds"] += waited
+
+    def on_success(self):
+        self.rate = min(self.quota, self.rate + self.quota * 0.05)
+
+    def on_throttled(self, retry_after: float | None):
+        self._stats["throttled"] += 1
+        self.rate = max(self.quota * 0.1, self.rate / 2)
+        self._tokens = 0.0
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self) -> dict:
+        return dict(
+            self._stats,
+            wait_seconds=round(self._stats["wait_seconds"], 2),
+            waiting=self._waiters,
+            rate_per_minute=round(self.rate * 60, 1),
+            quota_per_minute=round(self.quota * 60, 1),
+        )
+
+
+_rate_limiter = TokenBucket(PERPLEXITY_RATE_PER_MINUTE, PERPLEXITY_BURST, PERPLEXITY_MAX_QUEUE)
+_retry_stats = {"retried": 0, "gave_up": 0}
+
+
+def _retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(PERPLEXITY_BACKOFF_MAX, PERPLEXITY_BACKOFF_BASE * 2 ** attempt))
+
+
+# Search responses are cached on (normalized query, sorted domain filter, model);
+# compliance facts change slowly, so hits are served for a day by default.
+_search_cache = PersistentCache(
+    "web_search",
+    maxsize=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("WEB_SEARCH_CACHE_TTL", str(24 * 3600))),
+    persist=os.getenv("WEB_SEARCH_CACHE_PERSIST", "true").lower() == "true",
+)
+
+
+def _search_cache_key(query: str, domains: list = None) -> str:
+    normalized = " ".join(query.casefold().split())
+    raw = json.dumps([PERPLEXITY_MODEL, normalized, sorted(set(domains or []))], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def web_search_cache_stats() -> dict:
+    return _search_cache.stats()
+
+
+def perplexity_pool_stats() -> dict:
+    """Request and connection reuse counters of the shared session."""
+    stats = dict(_pool_stats)
+    stats["pool_size"] = PERPLEXITY_POOL_SIZE
+    opened = stats["connections_created"] + stats["connections_reused"]
+    stats["reuse_rate"] = round(stats["connections_reused"] / opened, 3) if opened else 0.0
+    stats["rate_limiter"] = dict(_rate_limiter.stats(), **_retry_stats)
+    return stats
+
+
+async def _read_stream(response, on_progress, query: str, attempt: int):
+    """Parse a streamed (SSE) completion, forwarding content deltas and new citations.
+
+    Returns:
+        tuple: (content, citations) of the complete response
+    """
+    content, citations = [], []
+    buffer = b""
+    async for chunk in response.content.iter_any():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                continue
+            event = json.loads(data)
+            choices = event.get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content") or ""
+            new_citations = event.get("citations") or citations
+            progress = {"query": query, "attempt": attempt}
+            if delta:
+                content.append(delta)
+                progress["delta"] = delta
+            if new_citations != citations:
+                citations = new_citations
+                progress["citations"] = citations
+            if len(progress) > 2:
+                on_progress(progress)
+    return "".join(content), citations
+
+
+async def perplexity_search(query: str, domains: list = None, use_cache: bool = True, on_progress=None):
     """
     Perplexity domain search for general queries.
+
+    Successful responses carry ``cache`` = "hit", "miss" or "bypass". With
+    ``on_progress`` (and PERPLEXITY_STREAM enabled) the completion is streamed
+    and every content delta / citation update is passed to the callback as
+    ``{"query", "attempt", "delta"?, "citations"?}``; the return value is the same.
     """
+    cache_key = _search_cache_key(query, domains)
+    if use_cache:
+        cached = await _search_cache.get(cache_key)
+        if cached is not None:
+            print(f"🛜 Perplexity cache hit")
+            return dict(cached, cache="hit")
+
     api_key = os.getenv("PERPLEXITY_API_KEY")
     if not api_key:
         print("❌ PERPLEXITY_API_KEY not found in environment variables")
@@ -27,28 +274,66 @@ async def perplexity_search(query: str, domains: list = None):
     ]
 
     payload = {
-        "model": "sonar-pro",
+        "model": PERPLEXITY_MODEL,
         "messages": messages,
         # "max_tokens": 1000,
         "temperature": 0.1
     }
     if domains:
         payload["search_domain_filter"] = domains
+    stream = on_progress is not None and PERPLEXITY_STREAM
+    if stream:
+        payload["stream"] = True
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    print(f"🛜 Perplexity API successful")
-                    # Expecting result["choices"][0]["message"]["content"] to be a JSON array
-                    content = result["choices"][0]["message"]["content"]
-                    citations = result.get('citations', [])
-                    # Parse the JSON content returned by Perplexity API
-                    return {"content": content, "citations": citations}
-                else:
-                    print(f"❌ Perplexity API failed with status {response.status}: {await response.text()}")
-                    return []
+        session = _get_session()
+        for attempt in range(PERPLEXITY_MAX_RETRIES + 1):
+            await _rate_limiter.acquire()
+            try:
+                async with session.post(url, headers=headers, json=payload) as response:
+                    if response.status == 200:
+                        if stream:
+                            content, citations = await _read_stream(response, on_progress, query, attempt)
+                        else:
+                            result = await response.json()
+                            # Expecting result["choices"][0]["message"]["content"] to be a JSON array
+                            content = result["choices"][0]["message"]["content"]
+                            citations = result.get('citations', [])
+                        _rate_limiter.on_success()
+                        print(f"🛜 Perplexity API successful")
+                        # Parse the JSON content returned by Perplexity API
+                        response_data = {"content": content, "citations": citations}
+                        if use_cache:
+                            await _search_cache.set(cache_key, response_data)
+                        return dict(response_data, cache="miss" if use_cache else "bypass")
+                    body = await response.text()
+                    if response.status != 429 and response.status < 500:
+                        print(f"❌ Perplexity API failed with status {response.status}: {body}")
+                        return []
+                    retry_after = _retry_after(response.headers.get("Retry-After"))
+                    throttled = response.status == 429
+                    if throttled:
+                        _rate_limiter.on_throttled(retry_after)
+                    error = f"status {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retry_after, throttled, error = None, False, str(e) or type(e).__name__
+            if attempt == PERPLEXITY_MAX_RETRIES:
+                break
+            # A 429 Retry-After pauses the shared bucket; a 5xx one is slept here
+            # (capped); without the header back off with jitter
+            if retry_after is None:
+                delay = _backoff(attempt)
+            else:
+                delay = 0.0 if throttled else min(retry_after, PERPLEXITY_BACKOFF_MAX)
+            _retry_stats["retried"] += 1
+            print(f"🔁 Perplexity API {error}, retry {attempt + 1}/{PERPLEXITY_MAX_RETRIES} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        _retry_stats["gave_up"] += 1
+        print(f"❌ Perplexity API failed after {PERPLEXITY_MAX_RETRIES} retries: {error}")
+        return []
+    except RateLimitQueueFull as e:
+        print(f"❌ Perplexity API throttled locally: {e}")
+        return []
     except Exception as e:
         print(f"❌ Perplexity API exception: {e}")
         return []
\ No newline at end of file
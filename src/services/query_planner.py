@@ -0,0 +1,455 @@
+"""
+Query planner for knowledge-base domain lookups - extracts facet keywords from a user query
+"""
+import os
+import re
+
+from pydantic import BaseModel
+from typing import List, Dict, Tuple
+from .cache_service import PersistentCache, normalize_query
+from .openai_service import get_openai_client
+
+# ─── 2.  Controlled vocab lists (for the prompt & validation) ─────────────
+ORG_TYPES = [
+    "government",
+    "standards_org",
+    "accreditation_body",
+    "certification_body",
+    "inspection_body",
+    "testing_lab",
+    "consulting_firm",
+]
+LEVELS = ["international", "supranational", "national", "subnational", "local"]
+COMPLIANCE = [
+    "toy_safety",
+    "electrical_electronics",
+    "chemical_substances",
+    "food_agriculture",
+    "medical_healthcare",
+    "automotive_transport",
+    "industrial_machinery",
+    "construction_building",
+    "environmental",
+    "occupational_safety",
+    "information_security",
+    "energy_utilities",
+    "textiles_apparel",
+    "aerospace_defense",
+    "consumer_products",
+]
+
+# ─── 3.  Prompt & JSON schema for GPT-4o-mini ─────────────────────────────
+PLAN_PROMPT = f"""
+    You are a Weaviate query planner for trade‑compliance search.
+
+    Guidelines
+    * Extract every relevant token for **each** facet; leave an array empty if nothing is clearly implied.
+    * Allowed vocabularies:
+        org_type = {ORG_TYPES}
+        level    = {LEVELS}
+        compliance_domain = {COMPLIANCE}
+    * Do **not** invent new tokens or fields.
+    * Keep JSON minified: no trailing commas, no extra keys, no additional whitespace outside strings.
+    Guidelines:
+    * org_type: list **every** organization type implied (e.g., certification_body, inspection_body).
+    * jurisdiction: include **each** ISO-3166-1 α-2 code for origin and destination; use GLOBAL for worldwide scope.
+    * If any EU member state is included, also include "EU" in the jurisdiction array.
+    * level: include each governance level implied (international, national, local, etc.).
+    * compliance_domain: include **all** compliance domain referenced or implied (e.g., food_agriculture, chemical_substances).
+    * Build vector_query by stripping filler words and focusing on core concepts (e.g., 'export honey certifications India US').
+    * Only use allowed tokens; do not invent new ones.
+    * Do NOT add any fields beyond the three specified.
+    * Ensure the JSON is strictly formatted with no extra whitespace or properties.
+
+    Example
+    User: "certifications to export honey from India to US"
+    Return:
+    {{
+    "keywords": {{
+        "jurisdiction": ["IN","US"],
+        "org_type": ["certification_body", "government", "standards_org"],
+        "level": ["international", "national"],
+        "compliance_domain": ["food_agriculture"]
+    }}
+    }}
+"""
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keywords": {
+            "type": "object",
+            "properties": {
+                "jurisdiction": {"type": "array", "items": {"type": "string"}},
+                "org_type": {"type": "array", "items": {"type": "string"}},
+                "level": {"type": "array", "items": {"type": "string"}},
+                "compliance_domain": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": [],
+        },
+    },
+    "required": ["vector_query", "keywords"],
+    "additionalProperties": False,
+}
+
+class Plan(BaseModel):
+    keywords: Dict[str, List[str]]
+
+async def _plan(query: str) -> Plan:
+    """Call GPT‑4o to get structured plan."""
+    resp = await get_openai_client().chat.completions.create(
+        model="gpt-4o",
+        temperature=0,
+        response_format={
+            "type": "json_schema",
+            "json_schema": {"name": "plan", "schema": SCHEMA},
+        },
+        messages=[
+            {"role": "system", "content": PLAN_PROMPT},
+            {"role": "user", "content": query},
+        ],
+    )
+    return Plan.model_validate_json(resp.choices[0].message.content)
+
+
+# Plans are memoized on the normalized query so repeat and near-repeat
+# questions skip the LLM planner entirely.
+_plan_cache = PersistentCache(
+    "query_plan",
+    maxsize=int(os.getenv("PLAN_CACHE_SIZE", "2048")),
+    ttl=float(os.getenv("PLAN_CACHE_TTL", str(7 * 24 * 3600))),
+    persist=os.getenv("PLAN_CACHE_PERSIST", "false").lower() == "true",
+)
+
+
+# ─── Rule-based fast path ─────────────────────────────────────────────────
+# The facet vocabularies are closed sets, so most queries can be planned with a
+# local gazetteer/keyword matcher in microseconds. The LLM planner is only used
+# when the rules are not confident.
+
+# ISO-3166-1 alpha-2 → names, aliases and demonyms (matched case-insensitively)
+COUNTRY_NAMES = {
+    "AE": ["united arab emirates", "uae", "emirati", "dubai", "abu dhabi"],
+    "AR": ["argentina", "argentine", "argentinian"],
+    "AT": ["austria", "austrian"],
+    "AU": ["australia", "australian"],
+    "BD": ["bangladesh", "bangladeshi"],
+    "BE": ["belgium", "belgian"],
+    "BG": ["bulgaria", "bulgarian"],
+    "BH": ["bahrain", "bahraini"],
+    "BR": ["brazil", "brazilian"],
+    "BY": ["belarus", "belarusian"],
+    "CA": ["canada", "canadian"],
+    "CH": ["switzerland", "swiss"],
+    "CL": ["chile", "chilean"],
+    "CN": ["china", "chinese", "prc", "china mainland", "mainland china"],
+    "CO": ["colombia", "colombian"],
+    "CR": ["costa rica"],
+    "CY": ["cyprus", "cypriot"],
+    "CZ": ["czech republic", "czechia", "czech"],
+    "DE": ["germany", "german"],
+    "DK": ["denmark", "danish"],
+    "DZ": ["algeria", "algerian"],
+    "EC": ["ecuador", "ecuadorian"],
+    "EE": ["estonia", "estonian"],
+    "EG": ["egypt", "egyptian"],
+    "ES": ["spain", "spanish"],
+    "ET": ["ethiopia", "ethiopian"],
+    "FI": ["finland", "finnish"],
+    "FR": ["france", "french"],
+    "GB": ["united kingdom", "u.k.", "great britain", "britain", "british", "england", "scotland", "wales"],
+    "GH": ["ghana", "ghanaian"],
+    "GR": ["greece", "greek"],
+    "HK": ["hong kong"],
+    "HR": ["croatia", "croatian"],
+    "HU": ["hungary", "hungarian"],
+    "ID": ["indonesia", "indonesian"],
+    "IE": ["ireland", "irish"],
+    "IL": ["israel", "israeli"],
+    "IN": ["india", "indian"],
+    "IQ": ["iraq", "iraqi"],
+    "IR": ["iran", "iranian"],
+    "IS": ["iceland", "icelandic"],
+    "IT": ["italy", "italian"],
+    "JO": ["jordan", "jordanian"],
+    "JP": ["japan", "japanese"],
+    "KE": ["kenya", "kenyan"],
+    "KH": ["cambodia", "cambodian"],
+    "KR": ["south korea", "korea", "korean", "republic of korea"],
+    "KW": ["kuwait", "kuwaiti"],
+    "KZ": ["kazakhstan", "kazakh"],
+    "LI": ["liechtenstein"],
+    "LK": ["sri lanka", "sri lankan"],
+    "LT": ["lithuania", "lithuanian"],
+    "LU": ["luxembourg"],
+    "LV": ["latvia", "latvian"],
+    "MA": ["morocco", "moroccan"],
+    "MM": ["myanmar", "burma"],
+    "MT": ["malta", "maltese"],
+    "MX": ["mexico", "mexican"],
+    "MY": ["malaysia", "malaysian"],
+    "NG": ["nigeria", "nigerian"],
+    "NL": ["netherlands", "dutch", "holland"],
+    "NO": ["norway", "norwegian"],
+    "NZ": ["new zealand"],
+    "OM": ["oman", "omani"],
+    "PE": ["peru", "peruvian"],
+    "PH": ["philippines", "filipino", "philippine"],
+    "PK": ["pakistan", "pakistani"],
+    "PL": ["poland", "polish"],
+    "PT": ["portugal", "portuguese"],
+    "QA": ["qatar", "qatari"],
+    "RO": ["romania", "romanian"],
+    "RS": ["serbia", "serbian"],
+    "RU": ["russia", "russian", "russian federation"],
+    "SA": ["saudi arabia", "saudi", "ksa"],
+    "SE": ["sweden", "swedish"],
+    "SG": ["singapore", "singaporean"],
+    "SI": ["slovenia", "slovenian"],
+    "SK": ["slovakia", "slovak"],
+    "TH": ["thailand", "thai"],
+    "TN": ["tunisia", "tunisian"],
+    "TR": ["turkey", "turkish", "turkiye"],
+    "TW": ["taiwan", "taiwanese"],
+    "TZ": ["tanzania", "tanzanian"],
+    "UA": ["ukraine", "ukrainian"],
+    "US": ["united states", "united states of america", "usa", "u.s.", "u.s.a."],
+    "UY": ["uruguay", "uruguayan"],
+    "UZ": ["uzbekistan"],
+    "VN": ["vietnam", "viet nam", "vietnamese"],
+    "ZA": ["south africa", "south african"],
+}
+
+EU_MEMBERS = {
+    "AT", "BE", "BG", "HR", "CY", "CZ", "DK", "EE", "FI", "FR", "DE", "GR", "HU", "IE",
+    "IT", "LV", "LT", "LU", "MT", "NL", "PL", "PT", "RO", "SK", "SI", "ES", "SE",
+}
+
+# Region-wide names that map straight to a jurisdiction token
+REGION_NAMES = {
+    "EU": ["eu", "european union", "europe", "european", "eea", "eu/eea", "ce marking"],
+    "GLOBAL": ["global", "globally", "worldwide", "any country"],
+}
+
+# Keywords → compliance_domain. Entries match whole tokens or phrases; a
+# trailing "*" makes the entry a token prefix ("agricultur*" → agriculture, agricultural)
+DOMAIN_KEYWORDS = {
+    "toy_safety": ["toy", "toys", "children's product*", "childrens product*", "kids", "baby", "infant*"],
+    "electrical_electronics": ["electronic*", "electric*", "battery", "batteries", "charger*", "phone*",
+                               "laptop*", "led", "lamp*", "appliance*", "wireless", "radio", "bluetooth",
+                               "wifi", "emc", "rohs", "fcc", "weee", "cable*", "power suppl*"],
+    "chemical_substances": ["chemical*", "reach", "substance*", "cosmetic*", "lipstick*", "lip balm*",
+                            "paint*", "coating*", "detergent*", "pesticide*", "sds", "hazardous", "solvent*"],
+    "food_agriculture": ["food*", "honey", "agricultur*", "spice*", "tea", "coffee", "rice", "fruit*",
+                         "vegetable*", "seafood", "fish", "meat", "dairy", "organic", "beverage*", "wine*",
+                         "grain*", "seed*", "fertili*", "haccp", "fda", "halal", "kosher"],
+    "medical_healthcare": ["medical", "medicine*", "pharma*", "drug*", "healthcare", "hospital*",
+                           "diagnostic*", "mask*", "glove*", "supplement*", "mdr", "ivd"],
+    "automotive_transport": ["automotive", "vehicle*", "car", "cars", "truck*", "tyre*", "tire*",
+                             "motorcycle*", "e-bike*", "bicycle*", "auto part*", "railway*", "marine"],
+    "industrial_machinery": ["machine*", "machinery", "industrial", "equipment", "pump*", "compressor*",
+                             "pressure", "atex", "tools"],
+    "construction_building": ["construction", "building*", "cement", "steel", "timber", "brick*",
+                              "window*", "door*", "insulation", "cpr"],
+    "environmental": ["environment*", "recycl*", "packaging", "waste", "carbon", "emission*",
+                      "sustainab*", "eco", "plastic*", "epr"],
+    "occupational_safety": ["occupational", "workplace", "worker*", "ppe", "helmet*", "safety shoe*",
+                            "protective"],
+    "information_security": ["cyber*", "information security", "data protection", "gdpr", "iso 27001",
+                             "privacy", "software", "cloud"],
+    "energy_utilities": ["energy", "solar", "photovoltaic", "wind", "utility", "utilities", "gas",
+                         "oil", "inverter*", "energy star", "efficiency"],
+    "textiles_apparel": ["textile*", "apparel", "garment*", "clothing", "fabric*", "shoe*", "footwear",
+                         "leather", "cotton", "yarn*", "fashion"],
+    "aerospace_defense": ["aerospace", "aircraft", "aviation", "drone*", "defense", "defence",
+                          "military", "as9100", "itar"],
+    "consumer_products": ["consumer", "furniture", "kitchen*", "cookware", "household", "jewelry",
+                          "jewellery", "sporting", "stationery", "gift*", "candle*"],
+}
+
+ORG_TYPE_KEYWORDS = {
+    "government": ["government*", "regulat*", "law", "laws", "legal", "mandatory", "customs", "export*",
+                   "import*", "ministry", "agency", "authority", "licen*", "permit*", "registration*"],
+    "standards_org": ["standard*", "iso", "iec", "astm", "ansi"],
+    "accreditation_body": ["accredit*"],
+    "certification_body": ["certif*", "mark", "marks", "marking", "label*", "scheme*"],
+    "inspection_body": ["inspect*", "audit*", "pre-shipment", "preshipment"],
+    "testing_lab": ["test", "tests", "testing", "lab", "labs", "laborator*", "sample*"],
+    "consulting_firm": ["consult*", "advis*", "representative*"],
+}
+
+SUBNATIONAL_KEYWORDS = ["state", "province*", "provincial", "california", "prop 65", "texas", "ontario", "quebec"]
+LOCAL_KEYWORDS = ["city", "municipal", "county", "local"]
+
+# Bare upper-case ISO codes ("US", "CN") are only trusted right after a route
+# word or next to an arrow ("export to US", "CN→EU"); elsewhere they collide
+# with scheme acronyms ("FCC ID", "CA Prop 65", "IT equipment").
+_ROUTE_CODE = re.compile(r"(?:\b(?:to|from|into)\s+|(?:→|->)\s*)([A-Z]{2})\b|\b([A-Z]{2})\s*(?:→|->)")
+
+# Rule plans scoring below this fall back to the LLM planner
+RULE_PLAN_MIN_CONFIDENCE = float(os.getenv("RULE_PLAN_MIN_CONFIDENCE", "0.75"))
+
+
+def _build_gazetteer():
+    phrases = {}
+    for code, names in COUNTRY_NAMES.items():
+        for name in names:
+            phrases[name] = code
+    for code, names in REGION_NAMES.items():
+        for name in names:
+            phrases[name] = code
+    return phrases
+
+
+_GAZETTEER = _build_gazetteer()
+_MAX_PHRASE_WORDS = max(len(p.split()) for p in _GAZETTEER)
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9][a-z0-9.'/\-]*[a-z0-9.]|[a-z0-9]", text.casefold())
+
+
+def _ngrams(tokens: List[str]):
+    for n in range(1, _MAX_PHRASE_WORDS + 1):
+        for i in range(len(tokens) - n + 1):
+            yield " ".join(tokens[i:i + n])
+
+
+def _match_keywords(text: str, tokens: List[str], table: Dict[str, List[str]]) -> List[str]:
+    """Return the keys of ``table`` with at least one keyword occurring in the text."""
+    found = []
+    for key, keywords in table.items():
+        for kw in keywords:
+            if kw.endswith("*"):
+                stem = kw[:-1]
+                hit = f" {stem}" in text if " " in stem else any(t.startswith(stem) for t in tokens)
+            else:
+                hit = f" {kw} " in text
+            if hit:
+                found.append(key)
+                break
+    return found
+
+
+def rule_based_plan(query: str) -> Tuple[Plan, float]:
+    """Extract facets with the local gazetteer and keyword tables.
+
+    Returns:
+        (Plan, confidence) where confidence is in [0, 1]
+    """
+    text = " " + " ".join(_tokens(query)) + " "
+    tokens = text.split()
+
+    # Jurisdictions: gazetteer phrases ("u.s." keeps its dot; "france." loses it)
+    jurisdiction = []
+    for gram in _ngrams(tokens):
+        code = _GAZETTEER.get(gram) or _GAZETTEER.get(gram.strip(".'"))
+        if code and code not in jurisdiction:
+            jurisdiction.append(code)
+    if re.search(r"\bUK\b", query) and "GB" not in jurisdiction:
+        jurisdiction.append("GB")
+    # ...plus bare ISO codes in route context; ignored in all-caps text
+    from_names = bool(jurisdiction)
+    if query != query.upper():
+        for match in _ROUTE_CODE.finditer(query):
+            code = match.group(1) or match.group(2)
+            if (code in COUNTRY_NAMES or code == "EU") and code not in jurisdiction:
+                jurisdiction.append(code)
+    if any(code in EU_MEMBERS for code in jurisdiction) and "EU" not in jurisdiction:
+        jurisdiction.append("EU")
+
+    compliance_domain = _match_keywords(text, tokens, DOMAIN_KEYWORDS)
+    org_type = _match_keywords(text, tokens, ORG_TYPE_KEYWORDS)
+    if not org_type and jurisdiction:
+        org_type = ["certification_body", "government", "standards_org"]
+
+    level = []
+    countries = [c for c in jurisdiction if c not in ("EU", "GLOBAL")]
+    if "GLOBAL" in jurisdiction or len(countries) > 1:
+        level.append("international")
+    if "EU" in jurisdiction:
+        level.append("supranational")
+    if countries:
+        level.append("national")
+    if _match_keywords(text, tokens, {"subnational": SUBNATIONAL_KEYWORDS}):
+        level.append("subnational")
+    if _match_keywords(text, tokens, {"local": LOCAL_KEYWORDS}):
+        level.append("local")
+
+    # A jurisdiction known only from bare codes counts for less
+    jurisdiction_weight = 0.5 if from_names else 0.35 if jurisdiction else 0.0
+    confidence = jurisdiction_weight + 0.5 * bool(compliance_domain)
+    plan = Plan(keywords={
+        "jurisdiction": jurisdiction,
+        "org_type": org_type,
+        "level": level,
+        "compliance_domain": compliance_domain,
+    })
+    return plan, confidence
+
+
+# Compliance_Artifacts.region labels for jurisdiction tokens that do not
+# title-case cleanly from COUNTRY_NAMES
+REGION_LABELS = {
+    "EU": ["EU/EEA", "EU", "European Union"],
+    "GLOBAL": ["Global"],
+    "CN": ["China Mainland", "China"],
+    "US": ["United States", "US", "USA"],
+    "GB": ["United Kingdom", "UK"],
+    "KR": ["South Korea", "Korea"],
+    "AE": ["United Arab Emirates", "UAE"],
+}
+
+
+def jurisdiction_regions(codes: List[str]) -> List[str]:
+    """Map ISO jurisdiction tokens to Compliance_Artifacts ``region`` labels (always incl. Global)."""
+    regions = []
+    for code in codes:
+        labels = REGION_LABELS.get(code)
+        if labels is None and code in COUNTRY_NAMES:
+            labels = [COUNTRY_NAMES[code][0].title()]
+        for label in labels or []:
+            if label not in regions:
+                regions.append(label)
+    if regions and "Global" not in regions:
+        regions.append("Global")
+    return regions
+
+
+# How often each planner path produced the plan
+_path_counts = {"rules": 0, "cache": 0, "llm": 0}
+
+
+async def plan_query(query: str) -> Tuple[Plan, str]:
+    """Return the facet plan for a query and the path that produced it.
+
+    The rule-based planner runs first; only low-confidence queries go to the
+    plan cache and, on a miss, the GPT-4o planner.
+
+    Returns:
+        (Plan, source) where source is "rules", "cache" or "llm"
+    """
+    plan, confidence = rule_based_plan(query)
+    if confidence >= RULE_PLAN_MIN_CONFIDENCE:
+        _path_counts["rules"] += 1
+        return plan, "rules"
+
+    key = normalize_query(query)
+    cached = await _plan_cache.get(key)
+    if cached is not None:
+        _path_counts["cache"] += 1
+        return Plan.model_validate(cached), "cache"
+
+    plan = await _plan(query)
+    await _plan_cache.set(key, plan.model_dump())
+    _path_counts["llm"] += 1
+    return plan, "llm"
+
+
+def plan_cache_stats() -> dict:
+    """Hit/miss counters of the query plan cache and planner path counts."""
+    stats = _plan_cache.stats()
+    total = sum(_path_counts.values())
+    stats["paths"] = dict(_path_counts)
+    stats["llm_calls_avoided"] = round(1 - _path_counts["llm"] / total, 3) if total else 0.0
+    return stats
@@ -0,0 +1,251 @@
+"""
+In-process snapshot index of the URL_Whitelist collection - local BM25 + cosine hybrid search
+"""
+import asyncio
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from weaviate.classes import query as wq
+
+WHITELIST_COLLECTION = "URL_Whitelist"
+WHITELIST_REFRESH_INTERVAL = float(os.getenv("WHITELIST_REFRESH_INTERVAL", "300"))
+
+# Weaviate BM25 defaults
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def _tokenize(text: str):
+    """Lower-cased alphanumeric tokens (Weaviate "word" tokenization)."""
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _text_of(properties: dict) -> str:
+    parts = []
+    for value in properties.values():
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(v for v in value if isinstance(v, str))
+    return " ".join(parts)
+
+
+def _normalize_scores(scores: dict) -> dict:
+    """Min-max normalize scores to [0, 1] (Weaviate relativeScoreFusion)."""
+    if not scores:
+        return {}
+    lo, hi = min(scores.values()), max(scores.values())
+    if hi == lo:
+        return {k: 1.0 for k in scores}
+    return {k: (v - lo) / (hi - lo) for k, v in scores.items()}
+
+
+class _Snapshot:
+    """Immutable index over one version of the collection."""
+
+    def __init__(self, objects: list, version):
+        self.version = version
+        self.properties = [obj["properties"] for obj in objects]
+        self.domains = [props.get("domain") for props in self.properties]
+
+        # BM25 inverted index: term -> [(doc_id, term_frequency)]
+        self.postings = defaultdict(list)
+        self.doc_len = np.zeros(len(objects), dtype=np.float32)
+        for doc_id, props in enumerate(self.properties):
+            counts = Counter(_tokenize(_text_of(props)))
+            self.doc_len[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                self.postings[term].append((doc_id, tf))
+        self.avgdl = float(self.doc_len.mean()) if len(objects) else 0.0
+        n = len(objects)
+        self.idf = {
+            term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+            for term, p in self.postings.items()
+        }
+
+        # Row-normalized vector matrix for cosine top-k (only if every object has a vector)
+        vectors = [obj["vector"] for obj in objects]
+        if vectors and all(v is not None for v in vectors):
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.vectors = matrix / norms
+        else:
+            self.vectors = None
+
+    def __len__(self):
+        return len(self.domains)
+
+    def bm25(self, query: str) -> dict:
+        scores = defaultdict(float)
+        for term in set(_tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = tf + _BM25_K1 * (1 - _BM25_B + _BM25_B * self.doc_len[doc_id] / self.avgdl)
+                scores[doc_id] += idf * tf * (_BM25_K1 + 1) / norm
+        return scores
+
+    def matching(self, facets: dict) -> set:
+        """Doc ids whose facet properties contain any of the requested values, for every facet."""
+        allowed = set(range(len(self.properties)))
+        for prop, values in facets.items():
+            wanted = {str(v).lower() for v in values}
+            hits = set()
+            for doc_id in allowed:
+                value = self.properties[doc_id].get(prop)
+                stored = value if isinstance(value, list) else [value]
+                if wanted & {str(v).lower() for v in stored if v is not None}:
+                    hits.add(doc_id)
+            allowed = hits
+        return allowed
+
+    def cosine(self, vector, limit: int, allowed: set | None = None) -> dict:
+        query = np.asarray(vector, dtype=np.float32)
+        if self.vectors is None or query.shape[0] != self.vectors.shape[1]:
+            return {}
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return {}
+        sims = self.vectors @ (query / norm)
+        if allowed is not None:
+            if not allowed:
+                return {}
+            mask = np.full(len(sims), -np.inf, dtype=np.float32)
+            mask[list(allowed)] = 0.0
+            sims = sims + mask
+        k = min(limit, len(sims) if allowed is None else len(allowed))
+        top = np.argpartition(-sims, k - 1)[:k]
+        return {int(i): float(sims[i]) for i in top}
+
+    def hybrid(self, query: str, vector=None, alpha: float = 0.5, limit: int = 5, candidates: int = 100,
+               facets: dict | None = None) -> list:
+        """Fuse normalized BM25 and cosine scores like Weaviate's relativeScoreFusion.
+
+        ``facets`` ({property: [values]}) restricts the candidates like a Weaviate
+        ``contains_any`` filter on each property.
+        """
+        allowed = self.matching(facets) if facets else None
+        keyword = self.bm25(query)
+        if allowed is not None:
+            keyword = {doc_id: score for doc_id, score in keyword.items() if doc_id in allowed}
+        keyword = dict(sorted(keyword.items(), key=lambda kv: kv[1], reverse=True)[:candidates])
+        semantic = self.cosine(vector, candidates, allowed) if vector is not None else {}
+        if not semantic:
+            alpha = 0.0
+        keyword, semantic = _normalize_scores(keyword), _normalize_scores(semantic)
+        fused = defaultdict(float)
+        for doc_id, score in keyword.items():
+            fused[doc_id] += (1 - alpha) * score
+        for doc_id, score in semantic.items():
+            fused[doc_id] += alpha * score
+        ranked = sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:limit]
+        return [(doc_id, float(score)) for doc_id, score in ranked]
+
+
+class WhitelistSnapshot:
+    """Local copy of URL_Whitelist served in-process and refreshed in the background.
+
+    The collection is small and changes rarely, so domain lookups are answered
+    from memory. A refresh is triggered when the object count or latest update
+    time in Weaviate changes.
+    """
+
+    def __init__(self, refresh_interval: float = WHITELIST_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._snapshot: _Snapshot | None = None
+        self._task: asyncio.Task | None = None
+        self._stats = {"loads": 0, "version_checks": 0, "local_searches": 0, "load_failures": 0}
+        self._search_time = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None and len(self._snapshot) > 0
+
+    async def _version(self, collection):
+        count = (await collection.aggregate.over_all(total_count=True)).total_count
+        latest = await collection.query.fetch_objects(
+            limit=1,
+            sort=wq.Sort.by_update_time(ascending=False),
+            return_properties=[],
+            return_metadata=wq.MetadataQuery(last_update_time=True),
+        )
+        updated = latest.objects[0].metadata.last_update_time if latest.objects else None
+        return count, updated.isoformat() if updated else None
+
+    async def load(self):
+        """Fetch every whitelist object (with vectors) and swap in a fresh index."""
+        from .knowledgebase_service import _get_weaviate_client
+        client = await _get_weaviate_client()
+        collection = client.collections.get(WHITELIST_COLLECTION)
+        version = await self._version(collection)
+        objects = []
+        async for obj in collection.iterator(include_vector=True):
+            vector = obj.vector
+            if isinstance(vector, dict):
+                vector = vector.get("default", next(iter(vector.values()), None))
+            objects.append({"properties": dict(obj.properties), "vector": vector})
+        self._snapshot = _Snapshot(objects, version)
+        self._stats["loads"] += 1
+        print(f"📚 URL_Whitelist snapshot loaded: {len(objects)} objects (version {version})")
+
+    async def refresh_if_changed(self) -> bool:
+        from .knowledgebase_service import _get_weaviate_client
+        self._stats["version_checks"] += 1
+        client = await _get_weaviate_client()
+        version = await self._version(client.collections.get(WHITELIST_COLLECTION))
+        if self._snapshot is not None and version == self._snapshot.version:
+            return False
+        await self.load()
+        return True
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh_if_changed()
+            except Exception as e:
+                self._stats["load_failures"] += 1
+                print(f"⚠️ URL_Whitelist snapshot refresh failed: {e}")
+
+    async def start(self):
+        """Load the snapshot (app startup) and start the background refresh."""
+        try:
+            await self.load()
+        except Exception as e:
+            self._stats["load_failures"] += 1
+            print(f"⚠️ URL_Whitelist snapshot unavailable, falling back to Weaviate: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def search(self, query: str, vector=None, alpha: float = 0.5, limit: int = 5, facets: dict | None = None) -> list:
+        """Return the top whitelist domains for a query from the local index."""
+        snapshot = self._snapshot
+        start = time.perf_counter()
+        ranked = snapshot.hybrid(query, vector=vector, alpha=alpha, limit=limit, facets=facets)
+        self._search_time += time.perf_counter() - start
+        self._stats["local_searches"] += 1
+        return [snapshot.domains[doc_id] for doc_id, _ in ranked]
+
+    def stats(self) -> dict:
+        stats = dict(self._stats)
+        snapshot = self._snapshot
+        stats["size"] = len(snapshot) if snapshot else 0
+        stats["version"] = snapshot.version if snapshot else None
+        stats["has_vectors"] = bool(snapshot is not None and snapshot.vectors is not None)
+        if stats["local_searches"]:
+            stats["avg_search_ms"] = round(1000 * self._search_time / stats["local_searches"], 3)
+        return stats
+
+
+whitelist_snapshot = WhitelistSnapshot()
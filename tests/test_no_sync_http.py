@@ -0,0 +1,70 @@
+"""
+Moderation and query planning must go through the shared async OpenAI client
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from src.agent_system import guardrails
+from src.services import openai_service, query_planner
+from src.services.cache_service import PersistentCache
+
+PLAN = {"keywords": {"jurisdiction": ["IN", "US"], "org_type": ["certification_body"],
+                     "level": ["national"], "compliance_domain": ["food_agriculture"]}}
+
+
+def _openai_response(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/moderations"):
+        return httpx.Response(200, json={
+            "id": "modr-test", "model": "omni-moderation-latest",
+            "results": [{"flagged": False, "categories": {}, "category_scores": {}}],
+        })
+    if request.url.path.endswith("/chat/completions"):
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-4o",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": json.dumps(PLAN)}}],
+        })
+    return httpx.Response(404)
+
+
+@pytest.fixture
+def async_only_openai(monkeypatch):
+    """Shared client on a mock async transport; any sync httpx request is recorded and fails."""
+    sync_requests = []
+
+    def sync_handle_request(transport, request):
+        sync_requests.append(str(request.url))
+        raise AssertionError(f"sync HTTP request to {request.url}")
+
+    monkeypatch.setattr(httpx.HTTPTransport, "handle_request", sync_handle_request)
+    async_requests = []
+
+    def handler(request):
+        async_requests.append(request.url.path)
+        return _openai_response(request)
+
+    client = AsyncOpenAI(api_key="test", http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(openai_service, "_openai_client", client)
+    monkeypatch.setattr(query_planner, "_plan_cache", PersistentCache("query_plan_test"))
+    return sync_requests, async_requests
+
+
+def test_input_moderation_uses_async_client(async_only_openai):
+    sync_requests, async_requests = async_only_openai
+    assert asyncio.run(guardrails.input_moderation("export honey to the US")) is False
+    assert async_requests == ["/v1/moderations"]
+    assert sync_requests == []
+
+
+def test_llm_planned_query_uses_async_client(async_only_openai):
+    sync_requests, async_requests = async_only_openai
+    # Too vague for the rule-based planner, so it goes to the LLM planner
+    plan, source = asyncio.run(query_planner.plan_query("what paperwork do I need"))
+    assert source == "llm"
+    assert plan.keywords["jurisdiction"] == ["IN", "US"]
+    assert async_requests == ["/v1/chat/completions"]
+    assert sync_requests == []